@@ -0,0 +1,31 @@
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class GenerationCache:
+    """
+    Serialized response bodies for a single scrape generation. Everything is
+    dropped as soon as a request arrives for a different generation.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.generation: Optional[int] = None
+        self._entries: OrderedDict[Hashable, bytes] = OrderedDict()
+
+    def get(self, generation: int, key: Hashable) -> Optional[bytes]:
+        if generation != self.generation:
+            return None
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def put(self, generation: int, key: Hashable, body: bytes):
+        if generation != self.generation:
+            self._entries.clear()
+            self.generation = generation
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
@@ -1,17 +1,85 @@
 import logging
-from typing import Optional
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Awaitable, Callable, Hashable, Optional, Union
 
-from fastapi import APIRouter, BackgroundTasks, Query, Request
-from fastapi.responses import HTMLResponse
+import orjson
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request
+from fastapi.responses import FileResponse, HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
-from app.config import MUSEUM_LABELS
-from app.database import query_exhibitions, query_status
+from app.api.cache import GenerationCache
+from app.api.schemas import Exhibition, ExhibitionChanges, MuseumStatus, ProfileInfo
+from app.config import MUSEUM_LABELS, SNAPSHOT_ENABLED
+from app.feeds import ALL_MUSEUMS, get_or_publish_feed
+from app.profiling import list_profiles, profile_path
+from app.snapshot import Snapshot, sync_snapshot
+from app.storage import get_storage
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
+# Served unhashed here; app.export rewrites these to content-hashed names
+templates.env.globals["static_url"] = lambda name: f"/static/{name}"
+
+# Serialized JSON bodies, reused until the next scrape generation
+response_cache = GenerationCache()
+
+
+def _json(data: object) -> Response:
+    return Response(orjson.dumps(data), media_type="application/json")
+
+
+async def _snapshot() -> Optional[Snapshot]:
+    return await sync_snapshot() if SNAPSHOT_ENABLED else None
+
+
+async def _generation_state(from_snapshot: bool) -> tuple[int, bool]:
+    """
+    (generation, settled) for the data a request will read. Reads served
+    from the snapshot are always settled; reads that go to storage are only
+    cached once no scrape run is writing and the snapshot has caught up
+    with storage, so both kinds of entry share one cache generation.
+    """
+    snapshot = await _snapshot()
+    if snapshot is not None and from_snapshot:
+        return snapshot.generation, True
+    generation, settled = await get_storage().generation_state()
+    if snapshot is not None and generation != snapshot.generation:
+        settled = False
+    return generation, settled
+
+
+async def _cached_json(
+    key: Hashable, build: Callable[[], Awaitable[object]], from_snapshot: bool = True,
+) -> Response:
+    """
+    Serve `await build()` as JSON with orjson, reusing the bytes for the rest
+    of the generation once no scrape run is writing to it. Pass
+    from_snapshot=False when `build` reads storage even if a snapshot exists.
+    """
+    generation, settled = await _generation_state(from_snapshot)
+    body = response_cache.get(generation, key) if settled else None
+    if body is None:
+        response = _json(await build())
+        if settled:
+            response_cache.put(generation, key, response.body)
+        return response
+    return Response(body, media_type="application/json")
+
+
+async def _labelled_exhibitions(museum: Optional[str], status: Optional[str], **dates) -> list[dict]:
+    """Query exhibitions enriched with human-readable museum labels."""
+    snapshot = await _snapshot()
+    if snapshot is not None and not dates:
+        exhibitions = snapshot.query(museum=museum, status=status)
+    else:
+        exhibitions = await get_storage().query_exhibitions(museum=museum, status=status, **dates)
+    for ex in exhibitions:
+        ex["museum_label"] = MUSEUM_LABELS.get(ex["museum"], ex["museum"])
+    return exhibitions
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -20,12 +88,8 @@ async def index(
     museum: Optional[str] = Query(default=None),
     status: Optional[str] = Query(default=None),
 ):
-    exhibitions = query_exhibitions(museum=museum, status=status)
-    status_data = query_status()
-
-    # Enrich with human-readable museum labels
-    for ex in exhibitions:
-        ex["museum_label"] = MUSEUM_LABELS.get(ex["museum"], ex["museum"])
+    exhibitions = await _labelled_exhibitions(museum, status)
+    status_data = await _query_status()
 
     return templates.TemplateResponse(
         "index.html",
@@ -40,25 +104,153 @@ async def index(
     )
 
 
-@router.get("/api/exhibitions")
+async def _query_status() -> list[dict]:
+    snapshot = await _snapshot()
+    if snapshot is not None:
+        return snapshot.status_summary
+    return await get_storage().query_status()
+
+
+async def _resolve_since(since: str) -> int:
+    """Accept either a generation number or an ISO 8601 timestamp."""
+    if since.isdigit():
+        return int(since)
+    try:
+        timestamp = datetime.fromisoformat(since.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="since must be a generation number or an ISO 8601 timestamp",
+        )
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return await get_storage().generation_at(timestamp.astimezone(timezone.utc).isoformat())
+
+
+# Handlers return pre-serialized responses; the models document the shape
+@router.get(
+    "/api/exhibitions",
+    response_model=Union[list[Exhibition], ExhibitionChanges],
+)
 async def api_exhibitions(
     museum: Optional[str] = Query(default=None),
     status: Optional[str] = Query(default=None),
+    since: Optional[str] = Query(default=None),
+    open_on: Optional[date] = Query(default=None, description="Open on this day"),
+    from_: Optional[date] = Query(default=None, alias="from", description="Open at some point from this day"),
+    to: Optional[date] = Query(default=None, description="Open at some point up to this day"),
+    closing_within: Optional[int] = Query(default=None, ge=0, description="Closes within this many days"),
 ):
-    exhibitions = query_exhibitions(museum=museum, status=status)
-    for ex in exhibitions:
-        ex["museum_label"] = MUSEUM_LABELS.get(ex["museum"], ex["museum"])
-    return exhibitions
+    if since is not None:
+        # Delta sync: only rows changed after the given generation, plus tombstones
+        changes = await get_storage().query_changes(await _resolve_since(since), museum=museum)
+        for ex in changes["changed"]:
+            ex["museum_label"] = MUSEUM_LABELS.get(ex["museum"], ex["museum"])
+        return _json(changes)
+
+    if from_ and to and from_ > to:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+
+    dates = {}
+    if open_on:
+        dates["open_from"] = dates["open_to"] = open_on
+    if from_:
+        dates["open_from"] = max(from_, dates.get("open_from", from_))
+    if to:
+        dates["open_to"] = min(to, dates.get("open_to", to))
+    if closing_within is not None:
+        today = date.today()
+        dates["ends_from"] = today
+        dates["ends_to"] = today + timedelta(days=closing_within)
+
+    return await _cached_json(
+        ("exhibitions", museum, status, *sorted(dates.items())),
+        lambda: _labelled_exhibitions(museum, status, **dates),
+        # Date filters need the span index, so they always read storage
+        from_snapshot=not dates,
+    )
 
 
-@router.get("/api/status")
+@router.get(
+    "/api/status",
+    response_model=list[MuseumStatus],
+)
 async def api_status():
-    return query_status()
+    return await _cached_json(("status",), _query_status)
 
 
 @router.post("/api/refresh")
-async def api_refresh(background_tasks: BackgroundTasks):
-    from app.scheduler import run_all_scrapers
-    background_tasks.add_task(run_all_scrapers)
-    logger.info("Manual refresh triggered")
+async def api_refresh(
+    background_tasks: BackgroundTasks,
+    profile: bool = Query(default=False, description="Profile the run; see /api/profiles"),
+):
+    from app.scheduler import run_all_scrapers, scrape_in_progress
+
+    if scrape_in_progress():
+        return {"status": "ok", "message": "Scrape already in progress"}
+    background_tasks.add_task(run_all_scrapers, profile=profile)
+    logger.info("Manual refresh triggered%s", " (profiled)" if profile else "")
     return {"status": "ok", "message": "Scrape started in background"}
+
+
+@router.get("/api/profiles", response_model=list[ProfileInfo])
+async def api_profiles():
+    return list_profiles()
+
+
+@router.get("/api/profiles/{name}")
+async def api_profile(name: str):
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Unknown profile")
+    return FileResponse(path, filename=name, media_type="application/octet-stream")
+
+
+def _not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence; compare weakly per RFC 9110
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def _feed_response(request: Request, museum: str, fmt: str) -> Response:
+    if museum != ALL_MUSEUMS and museum not in MUSEUM_LABELS:
+        raise HTTPException(status_code=404, detail="Unknown museum")
+
+    try:
+        feed = await get_or_publish_feed(f"{museum}.{fmt}")
+    except LookupError as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "60"})
+
+    last_modified = datetime.fromisoformat(feed["updated_at"])
+    headers = {
+        "ETag": feed["etag"],
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": "public, max-age=300",
+    }
+    if _not_modified(request, feed["etag"], last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(feed["body"], media_type=feed["media_type"], headers=headers)
+
+
+@router.get("/feeds/{museum}.ics")
+async def feed_ics(request: Request, museum: str):
+    return await _feed_response(request, museum, "ics")
+
+
+@router.get("/feeds/{museum}.atom")
+async def feed_atom(request: Request, museum: str):
+    return await _feed_response(request, museum, "atom")
+
+
+@router.get("/metrics")
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,47 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class Exhibition(BaseModel):
+    museum: str
+    museum_label: str
+    title: str
+    url: str
+    date_start: Optional[str] = None  # ISO 8601 date
+    date_end: Optional[str] = None    # ISO 8601 date
+    status: str                       # 'current' | 'upcoming' | 'unknown'
+    admission: Optional[str] = None   # 'free' | 'paid' | 'included'
+    raw_dates: Optional[str] = None
+    scraped_at: str
+
+
+class ChangedExhibition(Exhibition):
+    generation: int
+
+
+class Tombstone(BaseModel):
+    museum: str
+    url: str
+    generation: int
+
+
+class ExhibitionChanges(BaseModel):
+    generation: int
+    since: int
+    reset: bool
+    changed: list[ChangedExhibition]
+    removed: list[Tombstone]
+
+
+class MuseumStatus(BaseModel):
+    museum: str
+    last_scraped: Optional[str] = None
+    count: int
+
+
+class ProfileInfo(BaseModel):
+    name: str
+    format: str  # 'cprofile' | 'speedscope'
+    size: int
+    created_at: str
@@ -1,11 +1,83 @@
+import os
 import pathlib
 
 BASE_DIR = pathlib.Path(__file__).parent.parent
 DB_PATH = BASE_DIR / "data" / "museums.db"
 
+# Storage backend: "sqlite" (DB_PATH) or "postgres" (DATABASE_URL)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "sqlite")
+DATABASE_URL = os.environ.get("DATABASE_URL", "")
+PG_POOL_MIN_SIZE = int(os.environ.get("PG_POOL_MIN_SIZE", 1))
+PG_POOL_MAX_SIZE = int(os.environ.get("PG_POOL_MAX_SIZE", 10))
+# Rows per INSERT … ON CONFLICT statement
+PG_UPSERT_BATCH_SIZE = 1000
+
+# Memory-mapped read snapshots shared by all web workers on a host (see
+# app/snapshot.py). Off by default for PostgreSQL, whose web tier usually
+# spans hosts that would each keep their own copy.
+SNAPSHOT_ENABLED = os.environ.get(
+    "SNAPSHOT_ENABLED", "1" if STORAGE_BACKEND == "sqlite" else "0",
+) == "1"
+SNAPSHOT_DIR = pathlib.Path(os.environ.get("SNAPSHOT_DIR", BASE_DIR / "data" / "snapshots"))
+# How often each worker checks its snapshot against storage's generation
+SNAPSHOT_CHECK_SECONDS = float(os.environ.get("SNAPSHOT_CHECK_SECONDS", 30))
+
+# When set, export a static copy of the site here after every scrape run
+# (a symlink swapped atomically; see app/export.py)
+EXPORT_DIR = os.environ.get("EXPORT_DIR", "")
+
+# Opt-in profiling. PROFILER is "cprofile" (writes .pstats) or "pyinstrument"
+# (sampling, writes speedscope JSON; needs the optional pyinstrument package).
+PROFILER = os.environ.get("PROFILER", "cprofile")
+PROFILE_DIR = pathlib.Path(os.environ.get("PROFILE_DIR", BASE_DIR / "data" / "profiles"))
+# Profile every scrape run, not just ones triggered with /api/refresh?profile=1
+PROFILE_SCRAPES = os.environ.get("PROFILE_SCRAPES", "0") == "1"
+# Comma-separated request paths to profile, e.g. "/api/exhibitions,/"
+PROFILE_ROUTES = frozenset(p for p in os.environ.get("PROFILE_ROUTES", "").split(",") if p)
+# Newest profiles to keep on disk
+PROFILE_KEEP = 50
+
 # How often to re-scrape (hours)
 SCRAPE_INTERVAL_HOURS = 24
 
+# Only one scrape run at a time, across every process sharing the database.
+# A run still unfinished after this long is assumed to have died with its
+# process and no longer blocks new runs.
+SCRAPE_RUN_TIMEOUT_HOURS = 6
+
+# Where scrapers get their HTML: "live", "record" (live + save to
+# CASSETTE_DIR) or "replay" (serve from CASSETTE_DIR, no network)
+SCRAPE_TRANSPORT = os.environ.get("SCRAPE_TRANSPORT", "live")
+CASSETTE_DIR = pathlib.Path(os.environ.get("SCRAPE_CASSETTE_DIR", BASE_DIR / "data" / "cassettes"))
+# Simulated network latency for replay mode (milliseconds)
+REPLAY_LATENCY_MS = float(os.environ.get("SCRAPE_REPLAY_LATENCY_MS", 0))
+REPLAY_JITTER_MS = float(os.environ.get("SCRAPE_REPLAY_JITTER_MS", 0))
+
+# Memory-budget mode: run scrapers concurrently, admitting each one only while
+# RSS plus the estimates below stays under this many MB. 0 runs them sequentially.
+SCRAPE_MEMORY_BUDGET_MB = int(os.environ.get("SCRAPE_MEMORY_BUDGET_MB", 0))
+# Memory a heavy scraper is assumed to need beyond our own RSS (Chromium
+# runs in child processes, which /proc/self doesn't see)
+HEAVY_SCRAPER_ESTIMATE_MB = int(os.environ.get("HEAVY_SCRAPER_ESTIMATE_MB", 300))
+# Memory a light (static HTML) scraper is assumed to need for its parse tree
+LIGHT_SCRAPER_ESTIMATE_MB = int(os.environ.get("LIGHT_SCRAPER_ESTIMATE_MB", 50))
+# Rows per storage write while streaming a scraper's results into the DB
+SCRAPE_STORE_BATCH_SIZE = 200
+
+# Skip reconciliation when a fetch returns fewer than this fraction of the
+# museum's live rows (guards against partial or broken listing pages)
+RECONCILE_MIN_RATIO = 0.5
+
+# Tombstones are kept this many generations for delta-sync clients
+TOMBSTONE_RETENTION_GENERATIONS = 30
+
+# How often to purge old tombstones and compact the DB file (hours)
+COMPACT_INTERVAL_HOURS = 24 * 7
+
+# Retries for static scrapers on transport errors / 5xx responses
+HTTP_RETRIES = 2
+HTTP_RETRY_BACKOFF_SECONDS = 2
+
 # HTTP headers for static scrapers
 HTTP_HEADERS = {
     "User-Agent": (
@@ -1,8 +1,10 @@
+import json
 import sqlite3
 import logging
 from contextlib import contextmanager
-from datetime import datetime, timezone
-from app.config import DB_PATH
+from datetime import date, datetime, timedelta, timezone
+
+from app.config import DB_PATH, SCRAPE_RUN_TIMEOUT_HOURS, TOMBSTONE_RETENTION_GENERATIONS
 
 logger = logging.getLogger(__name__)
 
@@ -18,10 +20,83 @@ CREATE TABLE IF NOT EXISTS exhibitions (
     admission   TEXT,
     raw_dates   TEXT,
     scraped_at  TEXT NOT NULL,
+    generation  INTEGER NOT NULL DEFAULT 0,
+    removed_generation INTEGER,
     UNIQUE(museum, url)
 );
+
+CREATE TABLE IF NOT EXISTS scrape_generations (
+    generation  INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at  TEXT NOT NULL,
+    finished_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS feeds (
+    name        TEXT PRIMARY KEY,
+    media_type  TEXT NOT NULL,
+    body        BLOB NOT NULL,
+    etag        TEXT NOT NULL,
+    generation  INTEGER NOT NULL,
+    updated_at  TEXT NOT NULL
+);
 """
 
+# Columns added after the original schema shipped: (column, DDL).
+MIGRATIONS = [
+    ("admission", "ALTER TABLE exhibitions ADD COLUMN admission TEXT"),
+    ("generation", "ALTER TABLE exhibitions ADD COLUMN generation INTEGER NOT NULL DEFAULT 0"),
+    ("removed_generation", "ALTER TABLE exhibitions ADD COLUMN removed_generation INTEGER"),
+    ("finished_at", "ALTER TABLE scrape_generations ADD COLUMN finished_at TEXT"),
+]
+
+# Exhibition date spans as integer day numbers, indexed for interval
+# overlap. A missing start or end (including permanent displays) is
+# open-ended and stored as the sentinel below.
+OPEN_START_DAY = 0
+OPEN_END_DAY = 2**31 - 1
+
+_SPAN_START = f"COALESCE(CAST(julianday(NEW.date_start) AS INTEGER), {OPEN_START_DAY})"
+_SPAN_END = f"COALESCE(CAST(julianday(NEW.date_end) AS INTEGER), {OPEN_END_DAY})"
+
+# Created after migrations so they can reference migrated columns.
+INDEXES = f"""
+CREATE INDEX IF NOT EXISTS idx_exhibitions_generation ON exhibitions(generation);
+CREATE INDEX IF NOT EXISTS idx_exhibitions_removed ON exhibitions(removed_generation);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS exhibition_spans USING rtree_i32(id, start_day, end_day);
+
+-- min/max keep the R*Tree happy if a scraper ever yields end < start
+CREATE TRIGGER IF NOT EXISTS exhibitions_span_insert AFTER INSERT ON exhibitions BEGIN
+    INSERT INTO exhibition_spans VALUES (
+        NEW.id, min({_SPAN_START}, {_SPAN_END}), max({_SPAN_START}, {_SPAN_END})
+    );
+END;
+CREATE TRIGGER IF NOT EXISTS exhibitions_span_update
+AFTER UPDATE OF date_start, date_end ON exhibitions BEGIN
+    UPDATE exhibition_spans
+    SET start_day = min({_SPAN_START}, {_SPAN_END}),
+        end_day   = max({_SPAN_START}, {_SPAN_END})
+    WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS exhibitions_span_delete AFTER DELETE ON exhibitions BEGIN
+    DELETE FROM exhibition_spans WHERE id = OLD.id;
+END;
+"""
+
+# Backfills spans for rows written before the R*Tree existed.
+BACKFILL_SPANS = f"""
+INSERT INTO exhibition_spans (id, start_day, end_day)
+SELECT id, min(s, e), max(s, e) FROM (
+    SELECT id, {_SPAN_START.replace("NEW.", "")} AS s, {_SPAN_END.replace("NEW.", "")} AS e
+    FROM exhibitions
+    WHERE id NOT IN (SELECT id FROM exhibition_spans)
+)
+"""
+
+EXHIBITION_COLUMNS = (
+    "museum, title, url, date_start, date_end, status, admission, raw_dates, scraped_at"
+)
+
 
 def get_connection() -> sqlite3.Connection:
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -47,41 +122,193 @@ def db_connection():
 def init_db():
     with db_connection() as conn:
         conn.executescript(SCHEMA)
-        # Migrate existing DBs that predate the admission column
-        try:
-            conn.execute("ALTER TABLE exhibitions ADD COLUMN admission TEXT")
-            logger.info("Migrated: added admission column")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
+        # Migrate existing DBs that predate later columns
+        for column, ddl in MIGRATIONS:
+            try:
+                conn.execute(ddl)
+                logger.info("Migrated: added %s column", column)
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+        conn.executescript(INDEXES)
+        spans = conn.execute("SELECT COUNT(*) FROM exhibition_spans").fetchone()[0]
+        rows = conn.execute("SELECT COUNT(*) FROM exhibitions").fetchone()[0]
+        if spans < rows:
+            conn.execute(BACKFILL_SPANS)
+            logger.info("Migrated: indexed %d exhibition date spans", rows - spans)
     logger.info("Database initialised at %s", DB_PATH)
 
 
-def upsert_exhibition(conn: sqlite3.Connection, row: dict):
+def run_cutoff(now: datetime) -> str:
+    """Runs started before this and still unfinished are treated as abandoned."""
+    return (now - timedelta(hours=SCRAPE_RUN_TIMEOUT_HOURS)).isoformat()
+
+
+def begin_generation(conn: sqlite3.Connection) -> int | None:
+    """
+    Allocate the next scrape generation number, or return None while another
+    scrape run is in progress. The check and insert are one statement, so
+    they run under SQLite's write lock and can't race another process.
+    """
+    now = datetime.now(timezone.utc)
+    cur = conn.execute(
+        """
+        INSERT INTO scrape_generations (started_at)
+        SELECT ? WHERE NOT EXISTS (
+            SELECT 1 FROM scrape_generations
+            WHERE finished_at IS NULL AND started_at > ?
+        )
+        """,
+        (now.isoformat(), run_cutoff(now)),
+    )
+    return cur.lastrowid if cur.rowcount else None
+
+
+def finish_generation(conn: sqlite3.Connection, generation: int):
     conn.execute(
+        "UPDATE scrape_generations SET finished_at = ? WHERE generation = ?",
+        (datetime.now(timezone.utc).isoformat(), generation),
+    )
+
+
+def finished_generation(conn: sqlite3.Connection) -> int:
+    """The latest generation whose scrape run has finished (0 if none has)."""
+    row = conn.execute(
+        "SELECT MAX(generation) FROM scrape_generations WHERE finished_at IS NOT NULL"
+    ).fetchone()
+    return row[0] or 0
+
+
+def generation_state() -> tuple[int, bool]:
+    """
+    Return (latest generation, whether the data is settled: no scrape run,
+    of this generation or an older one, is still writing). Runs abandoned
+    past SCRAPE_RUN_TIMEOUT_HOURS don't count as writing.
+    """
+    with db_connection() as conn:
+        # No scrape yet: nothing will change until one starts
+        row = conn.execute(
+            """
+            SELECT COALESCE(MAX(generation), 0),
+                   NOT EXISTS (
+                       SELECT 1 FROM scrape_generations
+                       WHERE finished_at IS NULL AND started_at > ?
+                   )
+            FROM scrape_generations
+            """,
+            (run_cutoff(datetime.now(timezone.utc)),),
+        ).fetchone()
+        return row[0], bool(row[1])
+
+
+# The generation only moves when the visible content changes (or a removed
+# row reappears), so delta sync isn't flooded by scraped_at.
+UPSERT_SQL = """
+INSERT INTO exhibitions
+    (museum, title, url, date_start, date_end, status, admission, raw_dates, scraped_at, generation)
+VALUES
+    (:museum, :title, :url, :date_start, :date_end, :status, :admission, :raw_dates, :scraped_at, :generation)
+ON CONFLICT(museum, url) DO UPDATE SET
+    title      = excluded.title,
+    date_start = excluded.date_start,
+    date_end   = excluded.date_end,
+    status     = excluded.status,
+    admission  = excluded.admission,
+    raw_dates  = excluded.raw_dates,
+    scraped_at = excluded.scraped_at,
+    generation = CASE WHEN
+            title IS NOT excluded.title
+            OR date_start IS NOT excluded.date_start
+            OR date_end IS NOT excluded.date_end
+            OR status IS NOT excluded.status
+            OR admission IS NOT excluded.admission
+            OR raw_dates IS NOT excluded.raw_dates
+            OR removed_generation IS NOT NULL
+        THEN excluded.generation ELSE generation END,
+    removed_generation = NULL
+"""
+
+
+def upsert_exhibition(conn: sqlite3.Connection, row: dict):
+    conn.execute(UPSERT_SQL, row)
+
+
+def upsert_exhibitions(conn: sqlite3.Connection, rows: list[dict]):
+    conn.executemany(UPSERT_SQL, rows)
+
+
+def count_live(conn: sqlite3.Connection, museum: str) -> int:
+    row = conn.execute(
+        "SELECT COUNT(*) FROM exhibitions WHERE museum = ? AND removed_generation IS NULL",
+        (museum,),
+    ).fetchone()
+    return row[0]
+
+
+def tombstone_missing(
+    conn: sqlite3.Connection, museum: str, seen_urls: set[str], generation: int,
+) -> int:
+    """Mark live rows for `museum` whose URL wasn't seen this run as removed."""
+    cur = conn.execute(
         """
-        INSERT INTO exhibitions
-            (museum, title, url, date_start, date_end, status, admission, raw_dates, scraped_at)
-        VALUES
-            (:museum, :title, :url, :date_start, :date_end, :status, :admission, :raw_dates, :scraped_at)
-        ON CONFLICT(museum, url) DO UPDATE SET
-            title      = excluded.title,
-            date_start = excluded.date_start,
-            date_end   = excluded.date_end,
-            status     = excluded.status,
-            admission  = excluded.admission,
-            raw_dates  = excluded.raw_dates,
-            scraped_at = excluded.scraped_at
+        UPDATE exhibitions
+        SET removed_generation = ?
+        WHERE museum = ?
+          AND removed_generation IS NULL
+          AND url NOT IN (SELECT value FROM json_each(?))
         """,
-        row,
+        (generation, museum, json.dumps(sorted(seen_urls))),
     )
+    return cur.rowcount
+
+
+def compact_db() -> int:
+    """
+    Purge tombstones older than the retention window, then checkpoint the
+    WAL and VACUUM so the DB file shrinks back. Returns rows purged.
+    """
+    with db_connection() as conn:
+        # Counted from the finished generation, like query_changes' reset
+        # flag, so no client told not to reset misses a purged tombstone
+        horizon = finished_generation(conn) - TOMBSTONE_RETENTION_GENERATIONS
+        cur = conn.execute(
+            "DELETE FROM exhibitions WHERE removed_generation IS NOT NULL AND removed_generation <= ?",
+            (horizon,),
+        )
+        purged = cur.rowcount
+        conn.commit()
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("PRAGMA optimize")
+    logger.info("Compacted database: purged %d tombstones", purged)
+    return purged
+
+
+def day_number(d: date) -> int:
+    """Integer day number matching CAST(julianday(d) AS INTEGER) in SQLite."""
+    return d.toordinal() + 1721424
 
 
 def query_exhibitions(
     museum: str | None = None,
     status: str | None = None,
+    open_from: date | None = None,
+    open_to: date | None = None,
+    ends_from: date | None = None,
+    ends_to: date | None = None,
 ) -> list[dict]:
+    """
+    Filter by museum/status and, via the exhibition_spans R*Tree, by dates:
+    open_from/open_to keep exhibitions open at any point in that (inclusive)
+    range; ends_from/ends_to keep those whose closing date falls in it.
+    Open-ended exhibitions match any range and never "close". An inverted
+    range matches nothing.
+    """
+    if (open_from and open_to and open_from > open_to) or (
+        ends_from and ends_to and ends_from > ends_to
+    ):
+        return []
     with db_connection() as conn:
-        clauses = []
+        clauses = ["removed_generation IS NULL"]
         params: list = []
         if museum:
             clauses.append("museum = ?")
@@ -89,15 +316,36 @@ def query_exhibitions(
         if status:
             clauses.append("status = ?")
             params.append(status)
-        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+
+        span_clauses = []
+        if open_to:
+            span_clauses.append("start_day <= ?")
+            params.append(day_number(open_to))
+        if open_from:
+            span_clauses.append("end_day >= ?")
+            params.append(day_number(open_from))
+        if ends_from:
+            span_clauses.append("end_day >= ?")
+            params.append(day_number(ends_from))
+        if ends_to or ends_from:
+            span_clauses.append("end_day <= ?")
+            params.append(day_number(ends_to) if ends_to else OPEN_END_DAY - 1)
+        if span_clauses:
+            clauses.append(
+                "id IN (SELECT id FROM exhibition_spans WHERE "
+                + " AND ".join(span_clauses) + ")"
+            )
+
+        where = "WHERE " + " AND ".join(clauses)
         sql = f"""
-            SELECT museum, title, url, date_start, date_end, status, admission, raw_dates, scraped_at
+            SELECT {EXHIBITION_COLUMNS}
             FROM exhibitions
             {where}
             ORDER BY
                 CASE status WHEN 'current' THEN 0 WHEN 'upcoming' THEN 1 ELSE 2 END,
                 date_start ASC NULLS LAST,
-                museum ASC
+                museum ASC,
+                url ASC
         """
         rows = conn.execute(sql, params).fetchall()
         return [dict(r) for r in rows]
@@ -110,6 +358,7 @@ def query_status() -> list[dict]:
             """
             SELECT museum, MAX(scraped_at) as last_scraped, COUNT(*) as count
             FROM exhibitions
+            WHERE removed_generation IS NULL
             GROUP BY museum
             ORDER BY museum
             """
@@ -119,5 +368,128 @@ def query_status() -> list[dict]:
 
 def is_db_empty() -> bool:
     with db_connection() as conn:
-        row = conn.execute("SELECT COUNT(*) FROM exhibitions").fetchone()
+        row = conn.execute(
+            "SELECT COUNT(*) FROM exhibitions WHERE removed_generation IS NULL"
+        ).fetchone()
         return row[0] == 0
+
+
+def query_feed_entries(museum: str | None = None) -> list[dict]:
+    """
+    Live exhibitions for feeds, with `changed_at`: when the row's content last
+    changed (the start of its generation), so unchanged rows stay byte-stable.
+    """
+    with db_connection() as conn:
+        where = "WHERE e.removed_generation IS NULL"
+        params: list = []
+        if museum:
+            where += " AND e.museum = ?"
+            params.append(museum)
+        rows = conn.execute(
+            f"""
+            SELECT e.museum, e.title, e.url, e.date_start, e.date_end, e.status,
+                   e.admission, e.raw_dates,
+                   COALESCE(g.started_at, e.scraped_at) AS changed_at
+            FROM exhibitions e
+            LEFT JOIN scrape_generations g ON g.generation = e.generation
+            {where}
+            ORDER BY e.date_start ASC NULLS LAST, e.museum, e.url
+            """,
+            params,
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+def store_feed(
+    conn: sqlite3.Connection,
+    name: str,
+    media_type: str,
+    body: bytes,
+    etag: str,
+    generation: int,
+):
+    # updated_at (served as Last-Modified) only moves when the body changes
+    conn.execute(
+        """
+        INSERT INTO feeds (name, media_type, body, etag, generation, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            media_type = excluded.media_type,
+            body       = excluded.body,
+            generation = excluded.generation,
+            updated_at = CASE WHEN etag = excluded.etag
+                         THEN updated_at ELSE excluded.updated_at END,
+            etag       = excluded.etag
+        """,
+        (name, media_type, body, etag, generation, datetime.now(timezone.utc).isoformat()),
+    )
+
+
+def get_feed(name: str) -> dict | None:
+    with db_connection() as conn:
+        row = conn.execute(
+            "SELECT name, media_type, body, etag, generation, updated_at FROM feeds WHERE name = ?",
+            (name,),
+        ).fetchone()
+        return dict(row) if row else None
+
+
+def generation_at(timestamp: str) -> int:
+    """Return the last generation that finished at or before an ISO timestamp."""
+    with db_connection() as conn:
+        row = conn.execute(
+            "SELECT MAX(generation) FROM scrape_generations WHERE finished_at <= ?",
+            (timestamp,),
+        ).fetchone()
+        return row[0] or 0
+
+
+def query_changes(since: int, museum: str | None = None) -> dict:
+    """
+    Return exhibitions inserted or updated after generation `since`, plus
+    tombstones for rows removed after it. Only finished generations are
+    included: the returned cursor is the latest finished generation, so rows
+    a running scrape writes later are still picked up by the next call.
+    """
+    with db_connection() as conn:
+        generation = finished_generation(conn)
+        clauses = [
+            "((generation > ? AND generation <= ?)"
+            " OR (removed_generation > ? AND removed_generation <= ?))"
+        ]
+        params: list = [since, generation, since, generation]
+        if museum:
+            clauses.append("museum = ?")
+            params.append(museum)
+        rows = conn.execute(
+            f"""
+            SELECT {EXHIBITION_COLUMNS}, generation, removed_generation
+            FROM exhibitions
+            WHERE {" AND ".join(clauses)}
+            ORDER BY generation, museum, url
+            """,
+            params,
+        ).fetchall()
+
+        changed, removed = [], []
+        for r in rows:
+            row = dict(r)
+            removed_gen = row.pop("removed_generation")
+            # Removed by a run that hasn't finished: still live at the cursor
+            if removed_gen is not None and removed_gen <= generation:
+                removed.append({
+                    "museum": row["museum"],
+                    "url": row["url"],
+                    "generation": removed_gen,
+                })
+            else:
+                changed.append(row)
+
+        return {
+            "generation": generation,
+            "since": since,
+            # Tombstones this old may have been compacted away; resync in full
+            "reset": 0 < since < generation - TOMBSTONE_RETENTION_GENERATIONS,
+            "changed": changed,
+            "removed": removed,
+        }
@@ -0,0 +1,182 @@
+"""
+Export the site as static files so any web server or object store can serve
+it. The FastAPI app is then only needed to run the scrapers:
+
+    python -m app.export --out /var/www/museums
+
+Layout of the export:
+
+    index.html                                    all exhibitions
+    exhibitions/<museum|all>/<status|all>/index.html
+    api/exhibitions.json, api/status.json
+    api/exhibitions/<museum|all>/<status|all>.json
+    feeds/<museum|all>.ics, feeds/<museum|all>.atom
+    static/<name>.<hash>.<ext>                    safe to cache forever
+
+Each export is written to a fresh release directory next to `--out`, then
+`--out` (a symlink) is swapped to it with os.replace, so readers never see a
+half-written site.
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import pathlib
+import shutil
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+import orjson
+from jinja2 import Environment, FileSystemLoader
+
+from app.config import BASE_DIR, MUSEUM_LABELS
+from app.feeds import ALL_MUSEUMS, FEED_FORMATS, get_or_publish_feed
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("current", "upcoming", "unknown")
+STATIC_DIR = BASE_DIR / "static"
+TEMPLATE_DIR = BASE_DIR / "app" / "templates"
+# Previous releases kept for rollback (besides the live one)
+KEEP_RELEASES = 1
+
+
+def _write(path: pathlib.Path, body: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(body)
+
+
+def _hash_static(release: pathlib.Path) -> dict[str, str]:
+    """Copy static assets under content-hashed names. Returns name -> URL."""
+    urls = {}
+    for src in sorted(STATIC_DIR.iterdir()):
+        if not src.is_file():
+            continue
+        body = src.read_bytes()
+        digest = hashlib.sha256(body).hexdigest()[:12]
+        hashed = f"{src.stem}.{digest}{src.suffix}"
+        _write(release / "static" / hashed, body)
+        urls[src.name] = f"/static/{hashed}"
+    return urls
+
+
+def _page_dir(museum: Optional[str], status: Optional[str]) -> pathlib.PurePosixPath:
+    if not museum and not status:
+        return pathlib.PurePosixPath()
+    return pathlib.PurePosixPath("exhibitions", museum or "all", status or "all")
+
+
+async def _render(release: pathlib.Path) -> int:
+    """Write every page, JSON file and feed into `release`. Returns files written."""
+    from app.storage import get_storage
+
+    storage = get_storage()
+    static_urls = _hash_static(release)
+    env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=True)
+    env.globals["static_url"] = lambda name: static_urls[name]
+    template = env.get_template("index.html")
+
+    everything = await storage.query_exhibitions()
+    for ex in everything:
+        ex["museum_label"] = MUSEUM_LABELS.get(ex["museum"], ex["museum"])
+    status_data = await storage.query_status()
+
+    written = len(static_urls)
+    _write(release / "api" / "status.json", orjson.dumps(status_data))
+    _write(release / "api" / "exhibitions.json", orjson.dumps(everything))
+    written += 2
+
+    # Query order is total, so filtering the full list keeps each page's order
+    for museum in (None, *MUSEUM_LABELS):
+        for status in (None, *STATUSES):
+            rows = [
+                ex for ex in everything
+                if (museum is None or ex["museum"] == museum)
+                and (status is None or ex["status"] == status)
+            ]
+            html = template.render(
+                exhibitions=rows,
+                status_data=status_data,
+                museum_labels=MUSEUM_LABELS,
+                selected_museum=museum or "",
+                selected_status=status or "",
+                static_export=True,
+            )
+            _write(release / _page_dir(museum, status) / "index.html", html.encode())
+            _write(
+                release / "api" / "exhibitions" / (museum or "all") / f"{status or 'all'}.json",
+                orjson.dumps(rows),
+            )
+            written += 2
+
+    for museum in (ALL_MUSEUMS, *MUSEUM_LABELS):
+        for fmt in FEED_FORMATS:
+            name = f"{museum}.{fmt}"
+            feed = await get_or_publish_feed(name)
+            _write(release / "feeds" / name, feed["body"])
+            written += 1
+
+    return written
+
+
+def _swap(out: pathlib.Path, release: pathlib.Path):
+    """Point the `out` symlink at `release` atomically and prune old releases."""
+    link_tmp = out.with_name(f".{out.name}.tmp{os.getpid()}")
+    link_tmp.unlink(missing_ok=True)
+    link_tmp.symlink_to(os.path.relpath(release, out.parent), target_is_directory=True)
+    os.replace(link_tmp, out)
+
+    releases = sorted(p for p in release.parent.iterdir() if p.is_dir())
+    for old in releases[:-(KEEP_RELEASES + 1)]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+async def export_site(out: pathlib.Path) -> pathlib.Path:
+    """Export the current data as a static site at `out`. Returns the release directory."""
+    out = pathlib.Path(out).absolute()
+    if out.exists() and not out.is_symlink():
+        raise ValueError(f"{out} exists and is not a symlink; refusing to replace it")
+
+    releases = out.with_name(f".{out.name}-releases")
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    release = releases / stamp
+    release.mkdir(parents=True)
+    try:
+        written = await _render(release)
+    except BaseException:
+        shutil.rmtree(release, ignore_errors=True)
+        raise
+
+    _swap(out, release)
+    logger.info("Exported %d files to %s -> %s", written, out, release)
+    return release
+
+
+async def _main(out: pathlib.Path):
+    from app.storage import get_storage
+
+    storage = get_storage()
+    await storage.init_db()
+    try:
+        await export_site(out)
+    finally:
+        await storage.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=pathlib.Path, required=True, help="symlink to point at the export")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s — %(message)s")
+    try:
+        asyncio.run(_main(args.out))
+    except (ValueError, LookupError) as exc:
+        parser.error(str(exc))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
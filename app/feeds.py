@@ -0,0 +1,179 @@
+"""
+iCalendar and Atom feeds, rendered once per scrape generation and stored in
+the `feeds` table so polling clients are served precomputed bytes (or a 304).
+"""
+import hashlib
+import logging
+from datetime import date, datetime, timedelta
+from typing import Optional
+from xml.sax.saxutils import escape, quoteattr
+
+from app.config import MUSEUM_LABELS
+
+logger = logging.getLogger(__name__)
+
+ALL_MUSEUMS = "all"
+
+FEED_FORMATS = {
+    "ics": "text/calendar; charset=utf-8",
+    "atom": "application/atom+xml; charset=utf-8",
+}
+
+ADMISSION_LABELS = {"free": "Free", "paid": "Paid", "included": "Included with entry"}
+
+
+def _feed_title(museum: str) -> str:
+    if museum == ALL_MUSEUMS:
+        return "UK Museum Exhibitions"
+    return f"{MUSEUM_LABELS.get(museum, museum)} exhibitions"
+
+
+def _summary(ex: dict) -> str:
+    parts = [ex["raw_dates"], ADMISSION_LABELS.get(ex["admission"])]
+    return " · ".join(p for p in parts if p)
+
+
+# ── iCalendar (RFC 5545) ────────────────────────────────────────────────────
+
+def _ics_escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _ics_fold(line: str) -> str:
+    """Fold content lines longer than 75 octets without splitting characters."""
+    out, current = [], ""
+    for ch in line:
+        if len((current + ch).encode()) > 75:
+            out.append(current)
+            current = " " + ch
+        else:
+            current += ch
+    out.append(current)
+    return "\r\n".join(out)
+
+
+def _ics_timestamp(iso: str) -> str:
+    return datetime.fromisoformat(iso).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_ics(museum: str, entries: list[dict]) -> bytes:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//UK Museum Exhibitions//EN",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{_ics_escape(_feed_title(museum))}",
+    ]
+    for ex in entries:
+        start = date.fromisoformat(ex["date_start"]) if ex["date_start"] else None
+        end = date.fromisoformat(ex["date_end"]) if ex["date_end"] else None
+        # Calendars can't show open-ended spans: mark the known day instead
+        if start and end:
+            summary = ex["title"]
+        elif start:
+            summary, end = f"Opens: {ex['title']}", start
+        elif end:
+            summary, start = f"Last day: {ex['title']}", end
+        else:
+            continue
+
+        uid = hashlib.sha1(f"{ex['museum']}|{ex['url']}".encode()).hexdigest()
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{uid}@museums",
+            f"DTSTAMP:{_ics_timestamp(ex['changed_at'])}",
+            f"DTSTART;VALUE=DATE:{start:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{end + timedelta(days=1):%Y%m%d}",  # exclusive
+            f"SUMMARY:{_ics_escape(summary)}",
+            f"LOCATION:{_ics_escape(MUSEUM_LABELS.get(ex['museum'], ex['museum']))}",
+            f"URL:{ex['url']}",
+        ]
+        if _summary(ex):
+            lines.append(f"DESCRIPTION:{_ics_escape(_summary(ex))}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(_ics_fold(line) for line in lines) + "\r\n").encode()
+
+
+# ── Atom (RFC 4287) ─────────────────────────────────────────────────────────
+
+def render_atom(museum: str, entries: list[dict]) -> bytes:
+    updated = max((ex["changed_at"] for ex in entries), default="1970-01-01T00:00:00+00:00")
+    out = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"  <title>{escape(_feed_title(museum))}</title>",
+        f"  <id>urn:museums:feed:{escape(museum)}</id>",
+        f"  <updated>{updated}</updated>",
+        f'  <link rel="self" href="/feeds/{escape(museum)}.atom"/>',
+        "  <author><name>UK Museum Exhibitions</name></author>",
+    ]
+    for ex in entries:
+        title = ex["title"]
+        if museum == ALL_MUSEUMS:
+            title = f"{MUSEUM_LABELS.get(ex['museum'], ex['museum'])}: {title}"
+        out += [
+            "  <entry>",
+            f"    <title>{escape(title)}</title>",
+            f"    <id>{escape(ex['url'])}</id>",
+            f"    <link href={quoteattr(ex['url'])}/>",
+            f"    <updated>{ex['changed_at']}</updated>",
+            f"    <category term={quoteattr(ex['status'])}/>",
+        ]
+        if _summary(ex):
+            out.append(f"    <summary>{escape(_summary(ex))}</summary>")
+        out.append("  </entry>")
+    out.append("</feed>")
+    return ("\n".join(out) + "\n").encode()
+
+
+RENDERERS = {"ics": render_ics, "atom": render_atom}
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+async def publish_feeds(generation: Optional[int] = None) -> int:
+    """Render every feed from the current exhibitions and store it. Returns feeds written."""
+    from app.storage import get_storage
+
+    storage = get_storage()
+    if generation is None:
+        generation, _ = await storage.generation_state()
+
+    everything = await storage.query_feed_entries()
+    by_museum: dict[str, list[dict]] = {museum: [] for museum in MUSEUM_LABELS}
+    for ex in everything:
+        by_museum.setdefault(ex["museum"], []).append(ex)
+    by_museum[ALL_MUSEUMS] = everything
+
+    written = 0
+    for museum, entries in by_museum.items():
+        for fmt, media_type in FEED_FORMATS.items():
+            body = RENDERERS[fmt](museum, entries)
+            await storage.store_feed(f"{museum}.{fmt}", media_type, body, etag_for(body), generation)
+            written += 1
+
+    logger.info("Published %d feeds for generation %d", written, generation)
+    return written
+
+
+async def get_or_publish_feed(name: str) -> dict:
+    """
+    The stored feed `name`, publishing every feed first if it's missing (e.g.
+    the first request after upgrading). Raises LookupError if it still isn't
+    there afterwards.
+    """
+    from app.storage import get_storage
+
+    storage = get_storage()
+    feed = await storage.get_feed(name)
+    if feed is None:
+        await publish_feeds()
+        feed = await storage.get_feed(name)
+    if feed is None:
+        raise LookupError(f"Feed {name} has not been published")
+    return feed
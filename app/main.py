@@ -1,11 +1,15 @@
 import logging
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 
-from app.database import init_db, is_db_empty
+from app.config import PROFILE_ROUTES, SNAPSHOT_ENABLED
+from app.metrics import API_REQUEST_SECONDS
 from app.scheduler import run_all_scrapers, start_scheduler, stop_scheduler
+from app.snapshot import sync_snapshot
+from app.storage import get_storage
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,13 +21,17 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    init_db()
+    storage = get_storage()
+    await storage.init_db()
 
-    if is_db_empty():
+    if await storage.is_db_empty():
         logger.info("Database is empty — running initial scrape")
         await run_all_scrapers()
     else:
         logger.info("Database has data — skipping initial scrape")
+        if SNAPSHOT_ENABLED:
+            # Republishes a missing snapshot, or one left behind by storage
+            await sync_snapshot(force=True)
 
     start_scheduler()
 
@@ -31,9 +39,38 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     stop_scheduler()
+    await storage.close()
 
 
 app = FastAPI(title="UK Museum Exhibitions", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not raw path, to keep cardinality bounded
+    route = request.scope.get("route")
+    API_REQUEST_SECONDS.labels(
+        request.method,
+        route.path if route else "other",
+        str(response.status_code),
+    ).observe(time.perf_counter() - start)
+    return response
+
+
+if PROFILE_ROUTES:
+    # Only registered when configured, so unprofiled deployments pay nothing
+    from app.profiling import profiled
+
+    @app.middleware("http")
+    async def profile_routes(request: Request, call_next):
+        if request.url.path not in PROFILE_ROUTES:
+            return await call_next(request)
+        with profiled(f"route {request.method} {request.url.path}"):
+            return await call_next(request)
+
+
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 from app.api.routes import router  # noqa: E402
@@ -0,0 +1,126 @@
+"""
+Process memory accounting for scrape runs: RSS from /proc/self/status, peak
+tracking per scraper, and the admission gate used in memory-budget mode.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from app.metrics import SCRAPE_PEAK_RSS
+
+if TYPE_CHECKING:
+    from app.scrapers.base import BaseScraper
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# How often running trackers sample RSS (seconds)
+SAMPLE_INTERVAL = 0.05
+
+# Peak RSS so far for each scraper currently being tracked
+_active_peaks: dict[str, int] = {}
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process, or 0 where /proc isn't available."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def sample_rss():
+    """
+    Record current RSS against every tracked scraper. Scrapers call this at
+    points where memory is likely to peak (e.g. just before freeing a parse
+    tree), since the periodic sampler can't run while parsing blocks the loop.
+    """
+    rss = rss_bytes()
+    for museum, peak in _active_peaks.items():
+        if rss > peak:
+            _active_peaks[museum] = rss
+
+
+class PeakRSS:
+    bytes: int = 0
+
+
+@asynccontextmanager
+async def track_peak_rss(museum: str):
+    """
+    Track the peak process RSS while the body runs. When scrapers run
+    concurrently each one sees the whole process, so peaks overlap.
+    """
+    result = PeakRSS()
+    _active_peaks[museum] = rss_bytes()
+
+    async def sampler():
+        while True:
+            await asyncio.sleep(SAMPLE_INTERVAL)
+            sample_rss()
+
+    task = asyncio.create_task(sampler())
+    try:
+        yield result
+    finally:
+        task.cancel()
+        sample_rss()
+        result.bytes = _active_peaks.pop(museum)
+        SCRAPE_PEAK_RSS.labels(museum).set(result.bytes)
+
+
+class MemoryBudget:
+    """
+    Admits scrapers into a concurrent run. Each scraper reserves an estimate
+    (`heavy_estimate_mb` or `light_estimate_mb`) and waits until our RSS plus
+    every running scraper's reservation plus its own fits in `budget_mb`.
+    Reservations are held for the whole run even once a scraper's memory
+    shows up in RSS, erring on the side of staying under budget. A scraper
+    is always admitted when nothing else is running, so the run can't stall.
+    """
+
+    def __init__(
+        self,
+        budget_mb: int,
+        heavy_estimate_mb: int,
+        light_estimate_mb: int,
+        poll_seconds: float = 0.25,
+    ):
+        self.budget = budget_mb * MB
+        self.heavy_estimate = heavy_estimate_mb * MB
+        self.light_estimate = light_estimate_mb * MB
+        self.poll_seconds = poll_seconds
+        self.running = 0
+        self.reserved = 0
+
+    def _fits(self, estimate: int) -> bool:
+        if self.running == 0:
+            return True
+        return rss_bytes() + self.reserved + estimate <= self.budget
+
+    @asynccontextmanager
+    async def admit(self, scraper: "BaseScraper"):
+        estimate = self.heavy_estimate if scraper.heavy else self.light_estimate
+        waited = False
+        while not self._fits(estimate):
+            if not waited:
+                logger.info(
+                    "[%s] Waiting for memory budget (RSS %.0f MB, reserved %.0f MB, budget %.0f MB)",
+                    scraper.museum_slug, rss_bytes() / MB, self.reserved / MB, self.budget / MB,
+                )
+                waited = True
+            await asyncio.sleep(self.poll_seconds)
+
+        self.running += 1
+        self.reserved += estimate
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self.reserved -= estimate
@@ -0,0 +1,85 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Museum slug of the scraper currently running, so helpers that don't know
+# which scraper called them (e.g. date parsing) can still label by museum.
+current_museum: ContextVar[str] = ContextVar("current_museum", default="unknown")
+
+SCRAPE_STAGE_SECONDS = Histogram(
+    "museums_scrape_stage_seconds",
+    "Time spent in each scrape pipeline stage",
+    ["museum", "stage"],
+)
+DATE_PARSE_SECONDS = Histogram(
+    "museums_date_parse_seconds",
+    "Time spent parsing a single raw date range",
+    ["museum"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+SCRAPE_BYTES = Counter(
+    "museums_scrape_bytes_total",
+    "Bytes of HTML downloaded by scrapers",
+    ["museum"],
+)
+SCRAPE_HTTP_RESPONSES = Counter(
+    "museums_scrape_http_responses_total",
+    "HTTP responses received by scrapers, by status code",
+    ["museum", "status"],
+)
+SCRAPE_RETRIES = Counter(
+    "museums_scrape_retries_total",
+    "HTTP retries made by scrapers",
+    ["museum"],
+)
+SCRAPE_EXHIBITIONS = Gauge(
+    "museums_scrape_exhibitions_stored",
+    "Exhibitions stored by the last run of each scraper",
+    ["museum"],
+)
+SCRAPE_LAST_SUCCESS = Gauge(
+    "museums_scrape_last_success_timestamp_seconds",
+    "Unix time of the last successful fetch for each scraper",
+    ["museum"],
+)
+SCRAPE_PEAK_RSS = Gauge(
+    "museums_scrape_peak_rss_bytes",
+    "Peak process RSS observed while each scraper last ran",
+    ["museum"],
+)
+DB_WRITE_SECONDS = Histogram(
+    "museums_db_write_seconds",
+    "Latency of individual DB write operations",
+    ["operation"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0),
+)
+API_REQUEST_SECONDS = Histogram(
+    "museums_http_request_duration_seconds",
+    "API request latency by route",
+    ["method", "route", "status"],
+)
+
+
+@contextmanager
+def observe_stage(museum: str, stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        SCRAPE_STAGE_SECONDS.labels(museum, stage).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def observe_db_write(operation: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        DB_WRITE_SECONDS.labels(operation).observe(time.perf_counter() - start)
+
+
+def record_response(museum: str, status: int, size: int):
+    SCRAPE_HTTP_RESPONSES.labels(museum, str(status)).inc()
+    SCRAPE_BYTES.labels(museum).inc(size)
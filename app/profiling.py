@@ -0,0 +1,127 @@
+"""
+Opt-in profiling of scrape runs and selected routes. Results are written to
+PROFILE_DIR as .pstats (cProfile) or .speedscope.json (pyinstrument) files
+and listed through /api/profiles. Nothing here runs unless asked for.
+"""
+import cProfile
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.config import PROFILE_DIR, PROFILE_KEEP, PROFILER
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIXES = {".pstats": "cprofile", ".json": "speedscope"}
+
+# One profiler per process: cProfile and pyinstrument both hook the
+# interpreter globally, so a nested profile would corrupt the outer one.
+_active = False
+
+
+def _profile_name(label: str, suffix: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", label.lower()).strip("-") or "root"
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    return f"{slug}-{stamp}-{os.getpid()}{suffix}"
+
+
+def _write(name: str, write):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    path = PROFILE_DIR / name
+    tmp = PROFILE_DIR / f".{name}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+    for stale in list_profiles()[PROFILE_KEEP:]:
+        (PROFILE_DIR / stale["name"]).unlink(missing_ok=True)
+    logger.info("Wrote profile %s", path)
+
+
+@contextmanager
+def profiled(label: str):
+    """
+    Profile the enclosed block with PROFILER and save the result. Under
+    asyncio the profile also covers whatever else the loop runs meanwhile.
+    Skipped (with a log line) if another profile is already running; falls
+    back to cProfile if pyinstrument is requested but not installed.
+    """
+    global _active
+    if _active:
+        logger.info("Profiler busy — not profiling %s", label)
+        yield
+        return
+
+    profiler_name = PROFILER
+    if profiler_name == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+            from pyinstrument.renderers import SpeedscopeRenderer
+        except ImportError:
+            logger.warning("PROFILER=pyinstrument but pyinstrument isn't installed — using cProfile")
+            profiler_name = "cprofile"
+
+    _active = True
+    start = time.perf_counter()
+    try:
+        if profiler_name == "pyinstrument":
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                _save(
+                    _profile_name(label, ".speedscope.json"),
+                    lambda path: path.write_text(
+                        profiler.output(renderer=SpeedscopeRenderer()), encoding="utf-8",
+                    ),
+                )
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                _save(_profile_name(label, ".pstats"), lambda path: profiler.dump_stats(path))
+    finally:
+        _active = False
+        logger.info("Profiled %s in %.2fs", label, time.perf_counter() - start)
+
+
+def _save(name: str, write):
+    # A failed save must not fail the profiled scrape or request
+    try:
+        _write(name, write)
+    except Exception as exc:
+        logger.error("Saving profile %s failed: %s", name, exc, exc_info=True)
+
+
+def list_profiles() -> list[dict]:
+    """Saved profiles, newest first."""
+    if not PROFILE_DIR.is_dir():
+        return []
+    profiles = []
+    for path in PROFILE_DIR.iterdir():
+        if path.name.startswith(".") or path.suffix not in PROFILE_SUFFIXES:
+            continue
+        st = path.stat()
+        profiles.append({
+            "name": path.name,
+            "format": PROFILE_SUFFIXES[path.suffix],
+            "size": st.st_size,
+            "created_at": datetime.fromtimestamp(st.st_mtime, timezone.utc).isoformat(),
+        })
+    profiles.sort(key=lambda p: p["created_at"], reverse=True)
+    return profiles
+
+
+def profile_path(name: str) -> Optional[os.PathLike]:
+    """Path of a saved profile, or None. Only names from list_profiles() resolve."""
+    if any(p["name"] == name for p in list_profiles()):
+        return PROFILE_DIR / name
+    return None
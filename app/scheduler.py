@@ -1,14 +1,21 @@
+import asyncio
 import logging
+import pathlib
+from contextlib import nullcontext
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
-from app.config import SCRAPE_INTERVAL_HOURS
+from app.config import COMPACT_INTERVAL_HOURS, SCRAPE_INTERVAL_HOURS
 
 logger = logging.getLogger(__name__)
 
 _scheduler: AsyncIOScheduler | None = None
 
+# Held for the whole of a scrape run in this process; begin_generation
+# guards against runs in other processes
+_run_lock = asyncio.Lock()
+
 
 def get_scheduler() -> AsyncIOScheduler:
     global _scheduler
@@ -17,9 +24,48 @@ def get_scheduler() -> AsyncIOScheduler:
     return _scheduler
 
 
-async def run_all_scrapers():
-    """Run all scrapers sequentially, committing each to the DB."""
-    from app.database import db_connection
+def scrape_in_progress() -> bool:
+    """Whether this process is running a scrape."""
+    return _run_lock.locked()
+
+
+async def run_all_scrapers(profile: bool = False):
+    """
+    Run all scrapers, profiled when `profile` or PROFILE_SCRAPES is set.
+    Returns the number of exhibitions stored. Skipped (returning 0) while
+    another run is in progress here or in any process sharing the database.
+    """
+    from app.config import PROFILE_SCRAPES
+
+    if _run_lock.locked():
+        logger.info("Scrape run already in progress — skipping")
+        return 0
+    async with _run_lock:
+        if profile or PROFILE_SCRAPES:
+            from app.profiling import profiled
+
+            with profiled("scrape"):
+                return await _run_all_scrapers()
+        return await _run_all_scrapers()
+
+
+async def _run_all_scrapers():
+    """
+    Run all scrapers, committing each to storage. Sequential by default; with
+    SCRAPE_MEMORY_BUDGET_MB set they run concurrently, each admitted only
+    while the process stays within the budget.
+    """
+    from app.config import (
+        EXPORT_DIR,
+        HEAVY_SCRAPER_ESTIMATE_MB,
+        LIGHT_SCRAPER_ESTIMATE_MB,
+        SCRAPE_MEMORY_BUDGET_MB,
+        SNAPSHOT_ENABLED,
+    )
+    from app.feeds import publish_feeds
+    from app.memory import MB, MemoryBudget, PeakRSS, track_peak_rss
+    from app.snapshot import publish_snapshot
+    from app.storage import get_storage
     from app.scrapers.tate import TateScraper
     from app.scrapers.kew import KewScraper
     from app.scrapers.design_museum import DesignMuseumScraper
@@ -34,24 +80,82 @@ async def run_all_scrapers():
         VAMScraper(),
     ]
 
-    logger.info("Starting scrape run for %d museums", len(scrapers))
-    total = 0
+    storage = get_storage()
+    generation = await storage.begin_generation()
+    if generation is None:
+        logger.info("Another process is running a scrape — skipping")
+        return 0
+
+    logger.info(
+        "Starting scrape run for %d museums (generation %d)", len(scrapers), generation,
+    )
+    budget = (
+        MemoryBudget(SCRAPE_MEMORY_BUDGET_MB, HEAVY_SCRAPER_ESTIMATE_MB, LIGHT_SCRAPER_ESTIMATE_MB)
+        if SCRAPE_MEMORY_BUDGET_MB else None
+    )
+    peaks: dict[str, PeakRSS] = {}
+
+    async def run_one(scraper) -> int:
+        async with budget.admit(scraper) if budget else nullcontext():
+            async with track_peak_rss(scraper.museum_slug) as peak:
+                try:
+                    return await scraper.run(storage, generation)
+                except Exception as exc:
+                    logger.error(
+                        "Scraper %s failed at DB level: %s",
+                        scraper.museum_slug, exc, exc_info=True,
+                    )
+                    return 0
+                finally:
+                    peaks[scraper.museum_slug] = peak
+
+    try:
+        if budget:
+            counts = await asyncio.gather(*(run_one(s) for s in scrapers))
+        else:
+            counts = [await run_one(s) for s in scrapers]
+    finally:
+        # Even when cancelled, so the run doesn't block others until it times out
+        await storage.finish_generation(generation)
+    total = sum(counts)
+
+    try:
+        await publish_feeds(generation)
+    except Exception as exc:
+        logger.error("Publishing feeds failed: %s", exc, exc_info=True)
+
+    if SNAPSHOT_ENABLED:
+        try:
+            await publish_snapshot(generation)
+        except Exception as exc:
+            logger.error("Publishing snapshot failed: %s", exc, exc_info=True)
+
+    if EXPORT_DIR:
+        from app.export import export_site
 
-    for scraper in scrapers:
         try:
-            with db_connection() as conn:
-                count = await scraper.run(conn)
-                total += count
+            await export_site(pathlib.Path(EXPORT_DIR))
         except Exception as exc:
-            logger.error(
-                "Scraper %s failed at DB level: %s",
-                scraper.museum_slug, exc, exc_info=True,
-            )
+            logger.error("Static export failed: %s", exc, exc_info=True)
 
-    logger.info("Scrape run complete. Total exhibitions stored: %d", total)
+    logger.info(
+        "Scrape run complete. Total exhibitions stored: %d. Peak RSS: %s",
+        total,
+        ", ".join(f"{museum}={peak.bytes / MB:.0f}MB" for museum, peak in peaks.items()),
+    )
     return total
 
 
+async def compact_db():
+    """Purge old tombstones and compact the database."""
+    from app.storage import get_storage
+
+    try:
+        await get_storage().compact_db()
+    except Exception as exc:
+        logger.error("DB compaction failed: %s", exc, exc_info=True)
+
+
 def start_scheduler():
     scheduler = get_scheduler()
     scheduler.add_job(
@@ -61,6 +165,13 @@ def start_scheduler():
         max_instances=1,
         replace_existing=True,
     )
+    scheduler.add_job(
+        compact_db,
+        trigger=IntervalTrigger(hours=COMPACT_INTERVAL_HOURS),
+        id="compact_db",
+        max_instances=1,
+        replace_existing=True,
+    )
     scheduler.start()
     logger.info("Scheduler started, interval=%dh", SCRAPE_INTERVAL_HOURS)
 
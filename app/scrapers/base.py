@@ -1,16 +1,44 @@
+import asyncio
 import logging
 import re
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import date, datetime, timezone
-from typing import Optional
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
 
 import dateparser
+import httpx
+
+from app.config import (
+    HTTP_HEADERS,
+    HTTP_RETRIES,
+    HTTP_RETRY_BACKOFF_SECONDS,
+    SCRAPE_STORE_BATCH_SIZE,
+)
+from app.memory import sample_rss
+from app.metrics import (
+    DATE_PARSE_SECONDS,
+    SCRAPE_EXHIBITIONS,
+    SCRAPE_LAST_SUCCESS,
+    SCRAPE_RETRIES,
+    SCRAPE_STAGE_SECONDS,
+    current_museum,
+    observe_db_write,
+    observe_stage,
+    record_response,
+)
+from app.scrapers.transport import Transport, get_transport
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+    from app.storage import Storage
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class RawExhibition:
     title: str
     url: str
@@ -36,7 +64,17 @@ def _parse_single_date(text: str) -> Optional[date]:
 def parse_uk_date_range(raw: str) -> tuple[Optional[str], Optional[str]]:
     """
     Parse a UK-format date range string into (date_start, date_end) ISO strings.
+    Timed into DATE_PARSE_SECONDS for the scraper that's currently running.
+    """
+    start = time.perf_counter()
+    try:
+        return _parse_uk_date_range(raw)
+    finally:
+        DATE_PARSE_SECONDS.labels(current_museum.get()).observe(time.perf_counter() - start)
+
 
+def _parse_uk_date_range(raw: str) -> tuple[Optional[str], Optional[str]]:
+    """
     Handles patterns like:
       - "14 Mar – 26 Oct 2025"
       - "Until 26 October 2025"
@@ -96,15 +134,98 @@ def parse_uk_date_range(raw: str) -> tuple[Optional[str], Optional[str]]:
     return None, None
 
 
+class ParseStream:
+    """
+    Lazily iterates a scraper's parse() output so records can be stored as
+    they are extracted. Counts them and times the parser's own work into the
+    "parse" stage once it is exhausted.
+    """
+
+    def __init__(self, museum: str, records: Iterator[RawExhibition]):
+        self.museum = museum
+        self.count = 0
+        self._records = records
+        self._seconds = 0.0
+
+    def __iter__(self) -> "ParseStream":
+        return self
+
+    def __next__(self) -> RawExhibition:
+        start = time.perf_counter()
+        try:
+            record = next(self._records)
+        except StopIteration:
+            self._seconds += time.perf_counter() - start
+            SCRAPE_STAGE_SECONDS.labels(self.museum, "parse").observe(self._seconds)
+            raise
+        self._seconds += time.perf_counter() - start
+        self.count += 1
+        return record
+
+
 class BaseScraper(ABC):
     museum_slug: str
     base_url: str
+    # Drives a browser: gated by the memory budget in concurrent runs
+    heavy: bool = False
+
+    def __init__(self, transport: Optional[Transport] = None):
+        self.transport = transport or get_transport()
 
     @abstractmethod
-    async def fetch(self) -> list[RawExhibition]:
-        """Scrape the museum website and return raw exhibition data."""
+    async def download(self) -> str:
+        """Download the museum's listing page and return its HTML."""
         ...
 
+    @abstractmethod
+    def parse(self, html: str) -> Iterator[RawExhibition]:
+        """
+        Yield raw exhibition data from a listing page, freeing the parse tree
+        with free_tree() once every card has been yielded.
+        """
+        ...
+
+    def free_tree(self, soup: "BeautifulSoup"):
+        """
+        Release a parse tree once its cards are extracted, sampling RSS first
+        while the tree (usually the scraper's peak) is still alive.
+        """
+        sample_rss()
+        soup.decompose()
+
+    async def fetch(self) -> ParseStream:
+        """Download the listing page and return a lazy stream of its exhibitions."""
+        with observe_stage(self.museum_slug, "fetch"):
+            html = await self.transport.download(self)
+        return ParseStream(self.museum_slug, self.parse(html))
+
+    async def http_get(self, url: str) -> str:
+        """
+        GET a page with the shared static-scraper headers, retrying transport
+        errors and 5xx responses. Records status codes, bytes and retries.
+        """
+        async with httpx.AsyncClient(headers=HTTP_HEADERS, follow_redirects=True, timeout=30) as client:
+            for attempt in range(HTTP_RETRIES + 1):
+                if attempt:
+                    SCRAPE_RETRIES.labels(self.museum_slug).inc()
+                    await asyncio.sleep(HTTP_RETRY_BACKOFF_SECONDS * attempt)
+                try:
+                    resp = await client.get(url)
+                except httpx.TransportError as exc:
+                    if attempt == HTTP_RETRIES:
+                        raise
+                    logger.warning("[%s] GET %s failed: %s — retrying", self.museum_slug, url, exc)
+                    continue
+
+                record_response(self.museum_slug, resp.status_code, len(resp.content))
+                if resp.status_code >= 500 and attempt < HTTP_RETRIES:
+                    logger.warning(
+                        "[%s] GET %s returned %d — retrying", self.museum_slug, url, resp.status_code,
+                    )
+                    continue
+                resp.raise_for_status()
+                return resp.text
+
     def compute_status(
         self, start: Optional[str], end: Optional[str]
     ) -> str:
@@ -121,49 +242,123 @@ class BaseScraper(ABC):
             return "upcoming"
         return "current"
 
-    async def run(self, conn) -> int:
+    async def run(self, storage: "Storage", generation: int) -> int:
         """
-        Fetch exhibitions, compute status, and upsert to DB.
+        Fetch exhibitions, compute status, and upsert to storage under `generation`.
         Returns count of exhibitions stored. Never raises.
         """
-        from app.database import upsert_exhibition
-        from datetime import timezone
-
         scraped_at = datetime.now(timezone.utc).isoformat()
-        count = 0
+        seen_urls: set[str] = set()
+        current_museum.set(self.museum_slug)
 
         try:
             exhibitions = await self.fetch()
+            # Parsing happens here, one record at a time, as rows are stored
+            count = await self._store(storage, exhibitions, scraped_at, generation, seen_urls)
         except Exception as exc:
-            logger.error("[%s] fetch() failed: %s", self.museum_slug, exc, exc_info=True)
+            logger.error("[%s] Fetch or parse failed: %s", self.museum_slug, exc, exc_info=True)
             return 0
+        SCRAPE_LAST_SUCCESS.labels(self.museum_slug).set(time.time())
+        fetched = exhibitions.count
 
+        logger.info("[%s] Stored %d exhibitions", self.museum_slug, count)
+        SCRAPE_EXHIBITIONS.labels(self.museum_slug).set(count)
+        try:
+            with observe_stage(self.museum_slug, "reconcile"):
+                await self.reconcile(storage, fetched, seen_urls, generation)
+        except Exception as exc:
+            logger.error("[%s] Reconciliation failed: %s", self.museum_slug, exc, exc_info=True)
+        return count
+
+    async def _store(
+        self,
+        storage: "Storage",
+        exhibitions: Iterable[RawExhibition],
+        scraped_at: str,
+        generation: int,
+        seen_urls: set[str],
+    ) -> int:
+        """
+        Stream rows to storage in batches of SCRAPE_STORE_BATCH_SIZE. Time
+        spent writing is recorded as the "upsert" stage.
+        """
+        count, batch, write_seconds = 0, [], 0.0
         for ex in exhibitions:
-            try:
-                status = self.compute_status(ex.date_start, ex.date_end)
+            status = self.compute_status(ex.date_start, ex.date_end)
+
+            # Skip past exhibitions
+            if status == "past":
+                continue
+            seen_urls.add(ex.url)
+
+            batch.append({
+                "museum": self.museum_slug,
+                "title": ex.title,
+                "url": ex.url,
+                "date_start": ex.date_start,
+                "date_end": ex.date_end,
+                "status": status,
+                "admission": ex.admission,
+                "raw_dates": ex.raw_dates,
+                "scraped_at": scraped_at,
+                "generation": generation,
+            })
+            if len(batch) >= SCRAPE_STORE_BATCH_SIZE:
+                start = time.perf_counter()
+                count += await self._write_batch(storage, batch)
+                write_seconds += time.perf_counter() - start
+                batch = []
+
+        start = time.perf_counter()
+        if batch:
+            count += await self._write_batch(storage, batch)
+        write_seconds += time.perf_counter() - start
+        SCRAPE_STAGE_SECONDS.labels(self.museum_slug, "upsert").observe(write_seconds)
+        return count
 
-                # Skip past exhibitions
-                if status == "past":
-                    continue
+    async def _write_batch(self, storage: "Storage", rows: list[dict]) -> int:
+        try:
+            with observe_db_write("upsert_batch"):
+                await storage.upsert_exhibitions(rows)
+            return len(rows)
+        except Exception as exc:
+            logger.error(
+                "[%s] Batch store failed, retrying row by row: %s",
+                self.museum_slug, exc, exc_info=True,
+            )
 
-                row = {
-                    "museum": self.museum_slug,
-                    "title": ex.title,
-                    "url": ex.url,
-                    "date_start": ex.date_start,
-                    "date_end": ex.date_end,
-                    "status": status,
-                    "admission": ex.admission,
-                    "raw_dates": ex.raw_dates,
-                    "scraped_at": scraped_at,
-                }
-                upsert_exhibition(conn, row)
+        count = 0
+        for row in rows:
+            try:
+                with observe_db_write("upsert"):
+                    await storage.upsert_exhibitions([row])
                 count += 1
             except Exception as exc:
                 logger.error(
                     "[%s] Failed to store '%s': %s",
-                    self.museum_slug, ex.title, exc, exc_info=True,
+                    self.museum_slug, row["title"], exc, exc_info=True,
                 )
-
-        logger.info("[%s] Stored %d exhibitions", self.museum_slug, count)
         return count
+
+    async def reconcile(
+        self, storage: "Storage", fetched: int, seen_urls: set[str], generation: int,
+    ) -> int:
+        """
+        Tombstone rows for this museum that weren't seen in this run.
+        Skipped when the fetch looks partial. Returns count removed.
+        """
+        from app.config import RECONCILE_MIN_RATIO
+
+        live = await storage.count_live(self.museum_slug)
+        if fetched == 0 or fetched < live * RECONCILE_MIN_RATIO:
+            logger.warning(
+                "[%s] Skipping reconciliation: fetched %d listings vs %d live rows",
+                self.museum_slug, fetched, live,
+            )
+            return 0
+
+        with observe_db_write("tombstone"):
+            removed = await storage.tombstone_missing(self.museum_slug, seen_urls, generation)
+        if removed:
+            logger.info("[%s] Removed %d exhibitions no longer listed", self.museum_slug, removed)
+        return removed
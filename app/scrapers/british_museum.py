@@ -1,7 +1,9 @@
 import logging
+from typing import Iterator
 
 from bs4 import BeautifulSoup
 
+from app.metrics import record_response
 from app.scrapers.base import BaseScraper, RawExhibition, parse_uk_date_range
 
 logger = logging.getLogger(__name__)
@@ -13,9 +15,8 @@ class BritishMuseumScraper(BaseScraper):
     museum_slug = "british_museum"
     base_url = "https://www.britishmuseum.org"
 
-    async def fetch(self) -> list[RawExhibition]:
+    async def download(self) -> str:
         # curl-cffi impersonates Chrome at TLS level, bypassing Cloudflare
-        import asyncio
         from curl_cffi.requests import AsyncSession
 
         async with AsyncSession() as session:
@@ -24,11 +25,13 @@ class BritishMuseumScraper(BaseScraper):
                 impersonate="chrome",
                 timeout=30,
             )
+            record_response(self.museum_slug, resp.status_code, len(resp.content))
             resp.raise_for_status()
-            html = resp.text
+            return resp.text
 
+    def parse(self, html: str) -> Iterator[RawExhibition]:
         soup = BeautifulSoup(html, "lxml")
-        results = []
+        found = 0
         seen_urls = set()
 
         # Card structure:
@@ -78,16 +81,15 @@ class BritishMuseumScraper(BaseScraper):
             else:
                 admission = None
 
-            results.append(
-                RawExhibition(
-                    title=title,
-                    url=url,
-                    raw_dates=raw_dates,
-                    date_start=date_start,
-                    date_end=date_end,
-                    admission=admission,
-                )
+            found += 1
+            yield RawExhibition(
+                title=title,
+                url=url,
+                raw_dates=raw_dates,
+                date_start=date_start,
+                date_end=date_end,
+                admission=admission,
             )
 
-        logger.info("[british_museum] Found %d exhibitions", len(results))
-        return results
+        self.free_tree(soup)
+        logger.info("[british_museum] Found %d exhibitions", found)
@@ -1,9 +1,8 @@
 import logging
+from typing import Iterator
 
-import httpx
 from bs4 import BeautifulSoup
 
-from app.config import HTTP_HEADERS
 from app.scrapers.base import BaseScraper, RawExhibition, parse_uk_date_range
 
 logger = logging.getLogger(__name__)
@@ -15,13 +14,12 @@ class KewScraper(BaseScraper):
     museum_slug = "kew"
     base_url = "https://www.kew.org"
 
-    async def fetch(self) -> list[RawExhibition]:
-        async with httpx.AsyncClient(headers=HTTP_HEADERS, follow_redirects=True, timeout=30) as client:
-            resp = await client.get(WHATS_ON_URL)
-            resp.raise_for_status()
+    async def download(self) -> str:
+        return await self.http_get(WHATS_ON_URL)
 
-        soup = BeautifulSoup(resp.text, "lxml")
-        results = []
+    def parse(self, html: str) -> Iterator[RawExhibition]:
+        soup = BeautifulSoup(html, "lxml")
+        found = 0
         seen_urls = set()
 
         # Card structure:
@@ -77,16 +75,15 @@ class KewScraper(BaseScraper):
             else:
                 admission = None
 
-            results.append(
-                RawExhibition(
-                    title=title,
-                    url=url,
-                    raw_dates=raw_dates,
-                    date_start=date_start,
-                    date_end=date_end,
-                    admission=admission,
-                )
+            found += 1
+            yield RawExhibition(
+                title=title,
+                url=url,
+                raw_dates=raw_dates,
+                date_start=date_start,
+                date_end=date_end,
+                admission=admission,
             )
 
-        logger.info("[kew] Found %d exhibitions", len(results))
-        return results
+        self.free_tree(soup)
+        logger.info("[kew] Found %d exhibitions", found)
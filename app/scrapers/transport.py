@@ -0,0 +1,102 @@
+import asyncio
+import json
+import logging
+import os
+import pathlib
+import random
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from app.metrics import record_response
+
+if TYPE_CHECKING:
+    from app.scrapers.base import BaseScraper
+
+logger = logging.getLogger(__name__)
+
+
+class Transport(ABC):
+    """Decides where a scraper's listing HTML comes from."""
+
+    @abstractmethod
+    async def download(self, scraper: "BaseScraper") -> str:
+        ...
+
+
+class LiveTransport(Transport):
+    """Fetch from the museum's website (the default)."""
+
+    async def download(self, scraper: "BaseScraper") -> str:
+        return await scraper.download()
+
+
+class RecordingTransport(Transport):
+    """
+    Fetch live and save the raw HTML to `<cassette_dir>/<museum>.html`, with a
+    small JSON sidecar describing the recording.
+    """
+
+    def __init__(self, cassette_dir: pathlib.Path):
+        self.cassette_dir = cassette_dir
+
+    async def download(self, scraper: "BaseScraper") -> str:
+        html = await scraper.download()
+
+        self.cassette_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cassette_dir / f"{scraper.museum_slug}.html"
+        tmp = path.with_suffix(".html.tmp")
+        tmp.write_text(html, encoding="utf-8")
+        os.replace(tmp, path)
+        path.with_suffix(".json").write_text(json.dumps({
+            "museum": scraper.museum_slug,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "bytes": len(html.encode()),
+        }, indent=2) + "\n")
+
+        logger.info("[%s] Recorded cassette %s", scraper.museum_slug, path)
+        return html
+
+
+class ReplayTransport(Transport):
+    """
+    Serve HTML from a cassette directory instead of the network, optionally
+    sleeping `latency_ms` (± `jitter_ms`) first to imitate a real fetch.
+    """
+
+    def __init__(self, cassette_dir: pathlib.Path, latency_ms: float = 0, jitter_ms: float = 0):
+        self.cassette_dir = cassette_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+
+    async def download(self, scraper: "BaseScraper") -> str:
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        path = self.cassette_dir / f"{scraper.museum_slug}.html"
+        try:
+            html = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No cassette for {scraper.museum_slug} at {path}") from None
+
+        record_response(scraper.museum_slug, 200, len(html.encode()))
+        return html
+
+
+def get_transport() -> Transport:
+    """Build the transport selected by SCRAPE_TRANSPORT."""
+    from app.config import (
+        CASSETTE_DIR,
+        REPLAY_JITTER_MS,
+        REPLAY_LATENCY_MS,
+        SCRAPE_TRANSPORT,
+    )
+
+    if SCRAPE_TRANSPORT == "live":
+        return LiveTransport()
+    if SCRAPE_TRANSPORT == "record":
+        return RecordingTransport(CASSETTE_DIR)
+    if SCRAPE_TRANSPORT == "replay":
+        return ReplayTransport(CASSETTE_DIR, REPLAY_LATENCY_MS, REPLAY_JITTER_MS)
+    raise ValueError(f"Unknown SCRAPE_TRANSPORT {SCRAPE_TRANSPORT!r}")
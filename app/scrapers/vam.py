@@ -1,7 +1,9 @@
 import logging
+from typing import Iterator
 
 from bs4 import BeautifulSoup
 
+from app.metrics import record_response
 from app.scrapers.base import BaseScraper, RawExhibition, parse_uk_date_range
 
 logger = logging.getLogger(__name__)
@@ -12,8 +14,9 @@ WHATS_ON_URL = "https://www.vam.ac.uk/whatson"
 class VAMScraper(BaseScraper):
     museum_slug = "vam"
     base_url = "https://www.vam.ac.uk"
+    heavy = True
 
-    async def fetch(self) -> list[RawExhibition]:
+    async def download(self) -> str:
         from playwright.async_api import async_playwright
 
         async with async_playwright() as pw:
@@ -34,15 +37,20 @@ class VAMScraper(BaseScraper):
 
             page = await context.new_page()
             try:
-                await page.goto(WHATS_ON_URL, wait_until="networkidle", timeout=60000)
+                resp = await page.goto(WHATS_ON_URL, wait_until="networkidle", timeout=60000)
             except Exception as exc:
+                resp = None
                 logger.warning("[vam] Page load issue: %s", exc)
 
             html = await page.content()
             await browser.close()
 
+        record_response(self.museum_slug, resp.status if resp else 0, len(html.encode()))
+        return html
+
+    def parse(self, html: str) -> Iterator[RawExhibition]:
         soup = BeautifulSoup(html, "lxml")
-        results = []
+        found = 0
         seen_urls = set()
 
         # Card structure: the <a> IS the card
@@ -92,16 +100,15 @@ class VAMScraper(BaseScraper):
             else:
                 admission = None
 
-            results.append(
-                RawExhibition(
-                    title=title,
-                    url=url,
-                    raw_dates=raw_dates,
-                    date_start=date_start,
-                    date_end=date_end,
-                    admission=admission,
-                )
+            found += 1
+            yield RawExhibition(
+                title=title,
+                url=url,
+                raw_dates=raw_dates,
+                date_start=date_start,
+                date_end=date_end,
+                admission=admission,
             )
 
-        logger.info("[vam] Found %d exhibitions", len(results))
-        return results
+        self.free_tree(soup)
+        logger.info("[vam] Found %d exhibitions", found)
@@ -0,0 +1,274 @@
+"""
+Immutable, memory-mapped snapshots of the exhibitions table, one per scrape
+generation, so every uvicorn worker can serve reads from the same page-cache
+copy without touching the database.
+
+File layout (native byte order; snapshots never leave the host):
+
+    MAGIC | uint32 header length | JSON header | padding to 8 bytes
+    per column: uint32[2 * rows]  (heap offset, length; length NULL_LEN = NULL)
+    per museum / status: uint32[count]  row ids, in query order
+    string heap: UTF-8, each distinct string stored once
+
+Rows are stored in query_exhibitions order, so any index array is already
+correctly sorted.
+"""
+import json
+import logging
+import mmap
+import os
+import pathlib
+import time
+from array import array
+from typing import Optional
+
+from app.config import SNAPSHOT_CHECK_SECONDS, SNAPSHOT_DIR
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MUSNAP01"
+NULL_LEN = 0xFFFFFFFF
+POINTER_NAME = "current"
+KEEP_SNAPSHOTS = 2
+
+COLUMNS = (
+    "museum", "title", "url", "date_start", "date_end",
+    "status", "admission", "raw_dates", "scraped_at",
+)
+
+
+def _pad(buf: bytearray, alignment: int = 8):
+    buf.extend(b"\0" * (-len(buf) % alignment))
+
+
+def write_snapshot(
+    directory: pathlib.Path, generation: int, rows: list[dict], status: list[dict],
+) -> pathlib.Path:
+    """Serialize `rows` (already in query order) and write them atomically."""
+    heap = bytearray()
+    interned: dict[str, tuple[int, int]] = {}
+
+    def intern(value: Optional[str]) -> tuple[int, int]:
+        if value is None:
+            return 0, NULL_LEN
+        if value not in interned:
+            encoded = value.encode()
+            interned[value] = (len(heap), len(encoded))
+            heap.extend(encoded)
+        return interned[value]
+
+    columns = {}
+    for name in COLUMNS:
+        arr = array("I")
+        for row in rows:
+            arr.extend(intern(row[name]))
+        columns[name] = arr
+
+    indexes: dict[str, dict[str, array]] = {"museum": {}, "status": {}}
+    for i, row in enumerate(rows):
+        for field, index in indexes.items():
+            index.setdefault(row[field], array("I")).append(i)
+
+    # Lay out the body first to learn offsets, then prepend the header
+    body = bytearray()
+    layout = {"columns": {}, "museum": {}, "status": {}}
+    for name, arr in columns.items():
+        layout["columns"][name] = len(body)
+        body.extend(arr.tobytes())
+    for field, index in indexes.items():
+        for value, ids in index.items():
+            layout[field][value] = [len(body), len(ids)]
+            body.extend(ids.tobytes())
+    heap_offset = len(body)
+    body.extend(heap)
+
+    header = json.dumps({
+        "generation": generation,
+        "rows": len(rows),
+        "heap": heap_offset,
+        "status_summary": status,
+        **layout,
+    }).encode()
+    out = bytearray(MAGIC)
+    out.extend(array("I", [len(header)]).tobytes())
+    out.extend(header)
+    _pad(out)
+    out.extend(body)
+
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"exhibitions-{generation}.snap"
+    tmp = path.with_suffix(f".tmp{os.getpid()}")
+    tmp.write_bytes(out)
+    os.replace(tmp, path)
+
+    # Point readers at the new file with an atomic rename
+    pointer_tmp = directory / f"{POINTER_NAME}.tmp{os.getpid()}"
+    pointer_tmp.write_text(path.name)
+    os.replace(pointer_tmp, directory / POINTER_NAME)
+
+    # Workers still mapping an unlinked file keep it alive until they swap
+    old = sorted(directory.glob("exhibitions-*.snap"), key=lambda p: p.stat().st_mtime)
+    for stale in old[:-KEEP_SNAPSHOTS]:
+        stale.unlink(missing_ok=True)
+
+    logger.info("Published snapshot %s (%d rows, %d bytes)", path.name, len(rows), len(out))
+    return path
+
+
+class Snapshot:
+    """A read-only, zero-copy view of one snapshot file."""
+
+    def __init__(self, path: pathlib.Path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if view[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an exhibitions snapshot")
+
+        header_len = view[len(MAGIC):len(MAGIC) + 4].cast("I")[0]
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(view[start:start + header_len]))
+        base = start + header_len
+        base += -base % 8
+
+        self.path = path
+        self.generation: int = header["generation"]
+        self.rows: int = header["rows"]
+        self.status_summary: list[dict] = header["status_summary"]
+        self._heap = view[base + header["heap"]:]
+        self._columns = {
+            name: view[base + offset:base + offset + 8 * self.rows].cast("I")
+            for name, offset in header["columns"].items()
+        }
+        self._column_items = [(name, self._columns[name]) for name in COLUMNS]
+        self._indexes = {
+            field: {
+                value: view[base + offset:base + offset + 4 * count].cast("I")
+                for value, (offset, count) in header[field].items()
+            }
+            for field in ("museum", "status")
+        }
+
+    def _value(self, column: str, row: int) -> Optional[str]:
+        col = self._columns[column]
+        offset, length = col[2 * row], col[2 * row + 1]
+        if length == NULL_LEN:
+            return None
+        return str(self._heap[offset:offset + length], "utf-8")
+
+    def _row(self, row: int) -> dict:
+        heap, out = self._heap, {}
+        for name, col in self._column_items:
+            offset, length = col[2 * row], col[2 * row + 1]
+            out[name] = None if length == NULL_LEN else str(heap[offset:offset + length], "utf-8")
+        return out
+
+    def query(self, museum: Optional[str] = None, status: Optional[str] = None) -> list[dict]:
+        """Same results and order as query_exhibitions(museum, status)."""
+        if museum and status:
+            # Walk the smaller index and check the other column directly
+            by_museum = self._indexes["museum"].get(museum, ())
+            by_status = self._indexes["status"].get(status, ())
+            if len(by_museum) <= len(by_status):
+                ids = [i for i in by_museum if self._value("status", i) == status]
+            else:
+                ids = [i for i in by_status if self._value("museum", i) == museum]
+        elif museum:
+            ids = self._indexes["museum"].get(museum, ())
+        elif status:
+            ids = self._indexes["status"].get(status, ())
+        else:
+            ids = range(self.rows)
+        return [self._row(i) for i in ids]
+
+
+class SnapshotReader:
+    """
+    Maps the current snapshot and swaps to a newer one when the pointer file
+    changes. The check is a single stat() per call.
+    """
+
+    def __init__(self, directory: pathlib.Path):
+        self.directory = directory
+        self._pointer_stat: Optional[tuple[int, int]] = None
+        self._snapshot: Optional[Snapshot] = None
+
+    def current(self) -> Optional[Snapshot]:
+        pointer = self.directory / POINTER_NAME
+        try:
+            st = pointer.stat()
+        except FileNotFoundError:
+            return None
+
+        key = (st.st_ino, st.st_mtime_ns)
+        if key != self._pointer_stat:
+            try:
+                snapshot = Snapshot(self.directory / pointer.read_text().strip())
+            except (OSError, ValueError) as exc:
+                logger.warning("Could not map snapshot: %s", exc)
+                return self._snapshot
+            # Old mappings are released once in-flight references drop
+            self._snapshot, self._pointer_stat = snapshot, key
+        return self._snapshot
+
+
+_reader: Optional[SnapshotReader] = None
+# When this process last compared its snapshot with storage, and the
+# generation of a snapshot it found out of date (None if it matched)
+_checked_at = float("-inf")
+_stale_generation: Optional[int] = None
+
+
+def get_snapshot() -> Optional[Snapshot]:
+    """The current snapshot for this process, or None if none is published."""
+    global _reader
+    if _reader is None:
+        _reader = SnapshotReader(SNAPSHOT_DIR)
+    return _reader.current()
+
+
+async def publish_snapshot(generation: Optional[int] = None) -> pathlib.Path:
+    """Write the current exhibitions from storage as a new snapshot."""
+    from app.storage import get_storage
+
+    storage = get_storage()
+    if generation is None:
+        generation, _ = await storage.generation_state()
+    rows = await storage.query_exhibitions()
+    status = await storage.query_status()
+    return write_snapshot(SNAPSHOT_DIR, generation, rows, status)
+
+
+async def sync_snapshot(force: bool = False) -> Optional[Snapshot]:
+    """
+    The current snapshot, or None if there is none or it is behind storage.
+    At most every SNAPSHOT_CHECK_SECONDS (or when forced) its generation is
+    compared with storage's; if they differ and no scrape run is writing,
+    the snapshot is republished from storage. That catches scrapes by other
+    hosts sharing the database, failed publishes and snapshots left over
+    from before SNAPSHOT_ENABLED was turned back on.
+    """
+    global _checked_at, _stale_generation
+    from app.storage import get_storage
+
+    snapshot = get_snapshot()
+    now = time.monotonic()
+    if force or now - _checked_at >= SNAPSHOT_CHECK_SECONDS:
+        _checked_at = now
+        generation, settled = await get_storage().generation_state()
+        # Mid-run the snapshot still holds the last settled data: keep it
+        if settled and (snapshot is None or snapshot.generation != generation):
+            try:
+                await publish_snapshot(generation)
+                snapshot = get_snapshot()
+            except Exception as exc:
+                logger.error("Republishing snapshot failed: %s", exc, exc_info=True)
+        _stale_generation = (
+            snapshot.generation
+            if snapshot is not None and settled and snapshot.generation != generation
+            else None
+        )
+    # A newer snapshot published since the check is fine to serve
+    if snapshot is not None and snapshot.generation == _stale_generation:
+        return None
+    return snapshot
@@ -0,0 +1,20 @@
+from app.storage.base import Storage
+
+_storage: Storage | None = None
+
+
+def get_storage() -> Storage:
+    """Return the process-wide storage backend selected by STORAGE_BACKEND."""
+    global _storage
+    if _storage is None:
+        from app.config import DATABASE_URL, STORAGE_BACKEND
+
+        if STORAGE_BACKEND == "sqlite":
+            from app.storage.sqlite import SQLiteStorage
+            _storage = SQLiteStorage()
+        elif STORAGE_BACKEND == "postgres":
+            from app.storage.postgres import PostgresStorage
+            _storage = PostgresStorage(DATABASE_URL)
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}")
+    return _storage
@@ -0,0 +1,102 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Optional
+
+
+class Storage(ABC):
+    """
+    Persistence for exhibitions, scrape generations and published feeds.
+    Exhibition rows are dicts with the keys of the exhibitions table; dates
+    and timestamps are ISO 8601 strings in both directions.
+    """
+
+    @abstractmethod
+    async def init_db(self):
+        """Create or migrate the schema. Safe to call on every start-up."""
+
+    async def close(self):
+        """Release connections held by the backend."""
+
+    # ── Scrape runs ─────────────────────────────────────────────────────────
+
+    @abstractmethod
+    async def begin_generation(self) -> Optional[int]:
+        """
+        Allocate the next scrape generation number, or return None while
+        another scrape run (in any process) is in progress. Runs unfinished
+        after SCRAPE_RUN_TIMEOUT_HOURS are treated as abandoned.
+        """
+
+    @abstractmethod
+    async def finish_generation(self, generation: int):
+        ...
+
+    @abstractmethod
+    async def generation_state(self) -> tuple[int, bool]:
+        """
+        Return (latest generation, whether the data is settled: no scrape
+        run that hasn't timed out is unfinished, so rows can't still change).
+        """
+
+    @abstractmethod
+    async def generation_at(self, timestamp: str) -> int:
+        """Return the last generation that finished at or before an ISO timestamp."""
+
+    @abstractmethod
+    async def upsert_exhibitions(self, rows: list[dict]):
+        """
+        Insert or update rows in one batch. A row's generation only moves
+        when its content changes or a removed row reappears.
+        """
+
+    @abstractmethod
+    async def count_live(self, museum: str) -> int:
+        ...
+
+    @abstractmethod
+    async def tombstone_missing(self, museum: str, seen_urls: set[str], generation: int) -> int:
+        """Mark live rows for `museum` whose URL wasn't seen this run as removed."""
+
+    @abstractmethod
+    async def compact_db(self) -> int:
+        """Purge tombstones past the retention window and reclaim space."""
+
+    # ── Reads ───────────────────────────────────────────────────────────────
+
+    @abstractmethod
+    async def query_exhibitions(
+        self,
+        museum: Optional[str] = None,
+        status: Optional[str] = None,
+        open_from: Optional[date] = None,
+        open_to: Optional[date] = None,
+        ends_from: Optional[date] = None,
+        ends_to: Optional[date] = None,
+    ) -> list[dict]:
+        ...
+
+    @abstractmethod
+    async def query_status(self) -> list[dict]:
+        """Return last scrape time and exhibition count per museum."""
+
+    @abstractmethod
+    async def is_db_empty(self) -> bool:
+        ...
+
+    @abstractmethod
+    async def query_changes(self, since: int, museum: Optional[str] = None) -> dict:
+        """Rows changed after generation `since`, plus tombstones."""
+
+    @abstractmethod
+    async def query_feed_entries(self, museum: Optional[str] = None) -> list[dict]:
+        ...
+
+    # ── Feeds ───────────────────────────────────────────────────────────────
+
+    @abstractmethod
+    async def store_feed(self, name: str, media_type: str, body: bytes, etag: str, generation: int):
+        ...
+
+    @abstractmethod
+    async def get_feed(self, name: str) -> Optional[dict]:
+        ...
@@ -0,0 +1,390 @@
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from app.config import (
+    PG_POOL_MAX_SIZE,
+    PG_POOL_MIN_SIZE,
+    PG_UPSERT_BATCH_SIZE,
+    SCRAPE_RUN_TIMEOUT_HOURS,
+    TOMBSTONE_RETENTION_GENERATIONS,
+)
+from app.storage.base import Storage
+
+logger = logging.getLogger(__name__)
+
+# Same shape as the SQLite schema. Dates are real DATEs so the span column
+# can be a daterange; timestamps stay ISO text to match the API output.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS exhibitions (
+    id          BIGSERIAL PRIMARY KEY,
+    museum      TEXT NOT NULL,
+    title       TEXT NOT NULL,
+    url         TEXT NOT NULL,
+    date_start  DATE,
+    date_end    DATE,
+    status      TEXT NOT NULL,
+    admission   TEXT,
+    raw_dates   TEXT,
+    scraped_at  TEXT NOT NULL,
+    generation  BIGINT NOT NULL DEFAULT 0,
+    removed_generation BIGINT,
+    -- Inclusive date span; NULL bounds are open-ended. Reversed dates are
+    -- swapped rather than rejected.
+    span        DATERANGE GENERATED ALWAYS AS (
+        CASE WHEN date_start > date_end
+             THEN daterange(date_end, date_start, '[]')
+             ELSE daterange(date_start, date_end, '[]') END
+    ) STORED,
+    UNIQUE (museum, url)
+);
+
+CREATE TABLE IF NOT EXISTS scrape_generations (
+    generation  BIGSERIAL PRIMARY KEY,
+    started_at  TEXT NOT NULL,
+    finished_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS feeds (
+    name        TEXT PRIMARY KEY,
+    media_type  TEXT NOT NULL,
+    body        BYTEA NOT NULL,
+    etag        TEXT NOT NULL,
+    generation  BIGINT NOT NULL,
+    updated_at  TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_exhibitions_generation ON exhibitions (generation);
+CREATE INDEX IF NOT EXISTS idx_exhibitions_removed ON exhibitions (removed_generation);
+CREATE INDEX IF NOT EXISTS idx_exhibitions_span ON exhibitions USING gist (span);
+CREATE INDEX IF NOT EXISTS idx_exhibitions_span_upper ON exhibitions (upper(span));
+"""
+
+EXHIBITION_COLUMNS = (
+    "museum, title, url, date_start::text AS date_start, date_end::text AS date_end, "
+    "status, admission, raw_dates, scraped_at"
+)
+
+# One statement per batch: rows arrive as parallel arrays and are unnested
+# server-side. The text of every statement here is constant, so asyncpg's
+# per-connection cache keeps them as server-side prepared statements.
+UPSERT_SQL = """
+INSERT INTO exhibitions AS e
+    (museum, title, url, date_start, date_end, status, admission, raw_dates, scraped_at, generation)
+SELECT museum, title, url, date_start::date, date_end::date, status, admission, raw_dates, scraped_at, generation
+FROM unnest(
+    $1::text[], $2::text[], $3::text[], $4::text[], $5::text[],
+    $6::text[], $7::text[], $8::text[], $9::text[], $10::bigint[]
+) AS r(museum, title, url, date_start, date_end, status, admission, raw_dates, scraped_at, generation)
+ON CONFLICT (museum, url) DO UPDATE SET
+    title      = excluded.title,
+    date_start = excluded.date_start,
+    date_end   = excluded.date_end,
+    status     = excluded.status,
+    admission  = excluded.admission,
+    raw_dates  = excluded.raw_dates,
+    scraped_at = excluded.scraped_at,
+    generation = CASE WHEN
+            (e.title, e.date_start, e.date_end, e.status, e.admission, e.raw_dates)
+            IS DISTINCT FROM
+            (excluded.title, excluded.date_start, excluded.date_end,
+             excluded.status, excluded.admission, excluded.raw_dates)
+            OR e.removed_generation IS NOT NULL
+        THEN excluded.generation ELSE e.generation END,
+    removed_generation = NULL
+"""
+
+UPSERT_FIELDS = (
+    "museum", "title", "url", "date_start", "date_end",
+    "status", "admission", "raw_dates", "scraped_at", "generation",
+)
+
+
+# pg_advisory_xact_lock key serialising begin_generation across hosts
+SCRAPE_RUN_LOCK = 0x6D757365756D73  # "museums"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _run_cutoff() -> str:
+    """Runs started before this and still unfinished are treated as abandoned."""
+    return (datetime.now(timezone.utc) - timedelta(hours=SCRAPE_RUN_TIMEOUT_HOURS)).isoformat()
+
+
+class PostgresStorage(Storage):
+    """
+    PostgreSQL via an asyncpg connection pool, for running the web tier on
+    more than one host against a shared database.
+    """
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._pool = None
+
+    async def _get_pool(self):
+        if self._pool is None:
+            import asyncpg
+
+            self._pool = await asyncpg.create_pool(
+                self.dsn, min_size=PG_POOL_MIN_SIZE, max_size=PG_POOL_MAX_SIZE,
+            )
+        return self._pool
+
+    async def init_db(self):
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(SCHEMA)
+        logger.info("Database initialised (PostgreSQL)")
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def _fetch(self, sql: str, *args) -> list[dict]:
+        pool = await self._get_pool()
+        return [dict(r) for r in await pool.fetch(sql, *args)]
+
+    async def _fetchval(self, sql: str, *args):
+        pool = await self._get_pool()
+        return await pool.fetchval(sql, *args)
+
+    async def _execute(self, sql: str, *args) -> int:
+        """Run a statement and return the affected row count."""
+        pool = await self._get_pool()
+        status = await pool.execute(sql, *args)
+        return int(status.split()[-1])
+
+    # ── Scrape runs ─────────────────────────────────────────────────────────
+
+    async def begin_generation(self) -> Optional[int]:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn, conn.transaction():
+            # NOT EXISTS alone races under READ COMMITTED; the lock is held to commit
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", SCRAPE_RUN_LOCK)
+            return await conn.fetchval(
+                """
+                INSERT INTO scrape_generations (started_at)
+                SELECT $1::text WHERE NOT EXISTS (
+                    SELECT 1 FROM scrape_generations
+                    WHERE finished_at IS NULL AND started_at > $2
+                )
+                RETURNING generation
+                """,
+                _now(), _run_cutoff(),
+            )
+
+    async def finish_generation(self, generation: int):
+        await self._execute(
+            "UPDATE scrape_generations SET finished_at = $1 WHERE generation = $2",
+            _now(), generation,
+        )
+
+    async def generation_state(self) -> tuple[int, bool]:
+        rows = await self._fetch(
+            """
+            SELECT COALESCE(MAX(generation), 0) AS generation,
+                   NOT EXISTS (
+                       SELECT 1 FROM scrape_generations
+                       WHERE finished_at IS NULL AND started_at > $1
+                   ) AS settled
+            FROM scrape_generations
+            """,
+            _run_cutoff(),
+        )
+        return rows[0]["generation"], rows[0]["settled"]
+
+    async def generation_at(self, timestamp: str) -> int:
+        return await self._fetchval(
+            "SELECT MAX(generation) FROM scrape_generations WHERE finished_at <= $1",
+            timestamp,
+        ) or 0
+
+    async def upsert_exhibitions(self, rows: list[dict]):
+        # ON CONFLICT can't touch the same row twice in one statement
+        unique = list({(r["museum"], r["url"]): r for r in rows}.values())
+        pool = await self._get_pool()
+        async with pool.acquire() as conn, conn.transaction():
+            for i in range(0, len(unique), PG_UPSERT_BATCH_SIZE):
+                batch = unique[i:i + PG_UPSERT_BATCH_SIZE]
+                await conn.execute(UPSERT_SQL, *([r[f] for r in batch] for f in UPSERT_FIELDS))
+
+    async def count_live(self, museum: str) -> int:
+        return await self._fetchval(
+            "SELECT COUNT(*) FROM exhibitions WHERE museum = $1 AND removed_generation IS NULL",
+            museum,
+        )
+
+    async def tombstone_missing(self, museum: str, seen_urls: set[str], generation: int) -> int:
+        return await self._execute(
+            """
+            UPDATE exhibitions
+            SET removed_generation = $1
+            WHERE museum = $2
+              AND removed_generation IS NULL
+              AND NOT (url = ANY($3::text[]))
+            """,
+            generation, museum, list(seen_urls),
+        )
+
+    async def compact_db(self) -> int:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            status = await conn.execute(
+                """
+                DELETE FROM exhibitions
+                WHERE removed_generation IS NOT NULL
+                  AND removed_generation <= (
+                      SELECT COALESCE(MAX(generation), 0) FROM scrape_generations
+                      WHERE finished_at IS NOT NULL
+                  ) - $1
+                """,
+                TOMBSTONE_RETENTION_GENERATIONS,
+            )
+            # Outside a transaction, so VACUUM is allowed
+            await conn.execute("VACUUM (ANALYZE) exhibitions")
+        purged = int(status.split()[-1])
+        logger.info("Compacted database: purged %d tombstones", purged)
+        return purged
+
+    # ── Reads ───────────────────────────────────────────────────────────────
+
+    async def query_exhibitions(
+        self,
+        museum: Optional[str] = None,
+        status: Optional[str] = None,
+        open_from: Optional[date] = None,
+        open_to: Optional[date] = None,
+        ends_from: Optional[date] = None,
+        ends_to: Optional[date] = None,
+    ) -> list[dict]:
+        # daterange() rejects lower > upper; an inverted window matches nothing
+        if (open_from and open_to and open_from > open_to) or (
+            ends_from and ends_to and ends_from > ends_to
+        ):
+            return []
+        clauses = ["removed_generation IS NULL"]
+        params: list = []
+
+        def param(value) -> str:
+            params.append(value)
+            return f"${len(params)}"
+
+        if museum:
+            clauses.append(f"museum = {param(museum)}")
+        if status:
+            clauses.append(f"status = {param(status)}")
+        if open_from or open_to:
+            clauses.append(f"span && daterange({param(open_from)}::date, {param(open_to)}::date, '[]')")
+        if ends_from or ends_to:
+            # upper() of a canonical '[]' date range is the day after closing
+            clauses.append("NOT upper_inf(span)")
+            if ends_from:
+                clauses.append(f"upper(span) > {param(ends_from)}::date")
+            if ends_to:
+                clauses.append(f"upper(span) <= {param(ends_to)}::date + 1")
+
+        return await self._fetch(
+            f"""
+            SELECT {EXHIBITION_COLUMNS}
+            FROM exhibitions
+            WHERE {" AND ".join(clauses)}
+            ORDER BY
+                CASE status WHEN 'current' THEN 0 WHEN 'upcoming' THEN 1 ELSE 2 END,
+                date_start ASC NULLS LAST,
+                museum ASC,
+                url ASC
+            """,
+            *params,
+        )
+
+    async def query_status(self) -> list[dict]:
+        return await self._fetch(
+            """
+            SELECT museum, MAX(scraped_at) AS last_scraped, COUNT(*) AS count
+            FROM exhibitions
+            WHERE removed_generation IS NULL
+            GROUP BY museum
+            ORDER BY museum
+            """
+        )
+
+    async def is_db_empty(self) -> bool:
+        return not await self._fetchval(
+            "SELECT EXISTS (SELECT 1 FROM exhibitions WHERE removed_generation IS NULL)"
+        )
+
+    async def query_changes(self, since: int, museum: Optional[str] = None) -> dict:
+        # Cursor is the latest finished generation; see database.query_changes
+        generation = await self._fetchval(
+            "SELECT COALESCE(MAX(generation), 0) FROM scrape_generations WHERE finished_at IS NOT NULL"
+        )
+        rows = await self._fetch(
+            f"""
+            SELECT {EXHIBITION_COLUMNS}, generation, removed_generation
+            FROM exhibitions
+            WHERE ((generation > $1 AND generation <= $3)
+                   OR (removed_generation > $1 AND removed_generation <= $3))
+              AND ($2::text IS NULL OR museum = $2)
+            ORDER BY generation, museum, url
+            """,
+            since, museum, generation,
+        )
+
+        changed, removed = [], []
+        for row in rows:
+            removed_gen = row.pop("removed_generation")
+            if removed_gen is not None and removed_gen <= generation:
+                removed.append({"museum": row["museum"], "url": row["url"], "generation": removed_gen})
+            else:
+                changed.append(row)
+
+        return {
+            "generation": generation,
+            "since": since,
+            "reset": 0 < since < generation - TOMBSTONE_RETENTION_GENERATIONS,
+            "changed": changed,
+            "removed": removed,
+        }
+
+    async def query_feed_entries(self, museum: Optional[str] = None) -> list[dict]:
+        return await self._fetch(
+            """
+            SELECT e.museum, e.title, e.url, e.date_start::text AS date_start,
+                   e.date_end::text AS date_end, e.status, e.admission, e.raw_dates,
+                   COALESCE(g.started_at, e.scraped_at) AS changed_at
+            FROM exhibitions e
+            LEFT JOIN scrape_generations g ON g.generation = e.generation
+            WHERE e.removed_generation IS NULL
+              AND ($1::text IS NULL OR e.museum = $1)
+            ORDER BY e.date_start ASC NULLS LAST, e.museum, e.url
+            """,
+            museum,
+        )
+
+    # ── Feeds ───────────────────────────────────────────────────────────────
+
+    async def store_feed(self, name: str, media_type: str, body: bytes, etag: str, generation: int):
+        await self._execute(
+            """
+            INSERT INTO feeds AS f (name, media_type, body, etag, generation, updated_at)
+            VALUES ($1, $2, $3, $4, $5, $6)
+            ON CONFLICT (name) DO UPDATE SET
+                media_type = excluded.media_type,
+                body       = excluded.body,
+                generation = excluded.generation,
+                updated_at = CASE WHEN f.etag = excluded.etag
+                             THEN f.updated_at ELSE excluded.updated_at END,
+                etag       = excluded.etag
+            """,
+            name, media_type, body, etag, generation, _now(),
+        )
+
+    async def get_feed(self, name: str) -> Optional[dict]:
+        rows = await self._fetch(
+            "SELECT name, media_type, body, etag, generation, updated_at FROM feeds WHERE name = $1",
+            name,
+        )
+        return rows[0] if rows else None
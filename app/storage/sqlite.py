@@ -0,0 +1,65 @@
+from typing import Optional
+
+from app import database
+from app.storage.base import Storage
+
+
+class SQLiteStorage(Storage):
+    """
+    The single-file SQLite store in app.database. Calls run inline on the
+    event loop, as the app always has: queries are local and short.
+    """
+
+    async def init_db(self):
+        database.init_db()
+
+    async def begin_generation(self) -> Optional[int]:
+        with database.db_connection() as conn:
+            return database.begin_generation(conn)
+
+    async def finish_generation(self, generation: int):
+        with database.db_connection() as conn:
+            database.finish_generation(conn, generation)
+
+    async def generation_state(self) -> tuple[int, bool]:
+        return database.generation_state()
+
+    async def generation_at(self, timestamp: str) -> int:
+        return database.generation_at(timestamp)
+
+    async def upsert_exhibitions(self, rows: list[dict]):
+        with database.db_connection() as conn:
+            database.upsert_exhibitions(conn, rows)
+
+    async def count_live(self, museum: str) -> int:
+        with database.db_connection() as conn:
+            return database.count_live(conn, museum)
+
+    async def tombstone_missing(self, museum: str, seen_urls: set[str], generation: int) -> int:
+        with database.db_connection() as conn:
+            return database.tombstone_missing(conn, museum, seen_urls, generation)
+
+    async def compact_db(self) -> int:
+        return database.compact_db()
+
+    async def query_exhibitions(self, museum=None, status=None, **dates) -> list[dict]:
+        return database.query_exhibitions(museum=museum, status=status, **dates)
+
+    async def query_status(self) -> list[dict]:
+        return database.query_status()
+
+    async def is_db_empty(self) -> bool:
+        return database.is_db_empty()
+
+    async def query_changes(self, since: int, museum: Optional[str] = None) -> dict:
+        return database.query_changes(since, museum=museum)
+
+    async def query_feed_entries(self, museum: Optional[str] = None) -> list[dict]:
+        return database.query_feed_entries(museum)
+
+    async def store_feed(self, name: str, media_type: str, body: bytes, etag: str, generation: int):
+        with database.db_connection() as conn:
+            database.store_feed(conn, name, media_type, body, etag, generation)
+
+    async def get_feed(self, name: str) -> Optional[dict]:
+        return database.get_feed(name)
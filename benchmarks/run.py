@@ -0,0 +1,378 @@
+"""
+Offline benchmarks for the scrape, storage and query paths.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --scales 1000 10000 100000 1000000
+    python -m benchmarks.run --save-baseline
+    python -m benchmarks.run --only parse date
+    python -m benchmarks.run --only fetch --replay-latency-ms 300
+    python -m benchmarks.run --only json --json-rows 10000
+    python -m benchmarks.run --only db --postgres-dsn postgresql://localhost/museums_bench
+
+Scraper parsers replay the saved listing pages in benchmarks/fixtures, and
+the DB benchmarks use a throwaway SQLite file, so nothing touches the
+network or data/museums.db. The fixtures directory doubles as a replay
+cassette (see app.scrapers.transport), so SCRAPE_TRANSPORT=record can
+refresh it from the live sites. Each result reports throughput and peak Python
+heap (tracemalloc). Results are compared against benchmarks/baseline.json.
+
+The committed baseline was recorded on a developer machine with default
+options, so it is only a rough reference elsewhere. Before relying on
+--fail-on-regression in CI, run --save-baseline once on the CI runner (and
+again whenever its hardware changes) so comparisons are like for like.
+"""
+import argparse
+import asyncio
+import json
+import pathlib
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+
+from app import database
+from app.metrics import current_museum
+from app.scrapers.base import RawExhibition, parse_uk_date_range
+from app.scrapers.british_museum import BritishMuseumScraper
+from app.scrapers.design_museum import DesignMuseumScraper
+from app.scrapers.kew import KewScraper
+from app.scrapers.tate import TateScraper
+from app.scrapers.transport import ReplayTransport
+from app.scrapers.vam import VAMScraper
+
+BENCH_DIR = pathlib.Path(__file__).parent
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+SCRAPERS = [TateScraper, KewScraper, DesignMuseumScraper, BritishMuseumScraper, VAMScraper]
+MUSEUMS = [cls.museum_slug for cls in SCRAPERS]
+
+DEFAULT_SCALES = [1_000, 10_000, 100_000]
+
+# One of each shape parse_uk_date_range handles
+DATE_SAMPLES = [
+    "14 Mar – 26 Oct 2025",
+    "14 March - 26 October 2025",
+    "14 March – 26 October",
+    "Until 26 October 2025",
+    "Closes Sunday, 22 March 2026",
+    "From 14 March 2025",
+    "Opens 3 May 2026",
+    "Free display: Until 5 Jan 2026",
+    "Permanent",
+    "12 April 2026",
+]
+
+
+@dataclass
+class Result:
+    name: str
+    ops: int
+    seconds: float
+    peak_bytes: int
+
+    @property
+    def throughput(self) -> float:
+        return self.ops / self.seconds if self.seconds else float("inf")
+
+
+def measure(name: str, fn, ops: int, repeat: int = 3) -> Result:
+    """Best-of-`repeat` wall time, then one extra pass under tracemalloc."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(name=name, ops=ops, seconds=best, peak_bytes=peak)
+
+
+def bench_parse(args) -> list[Result]:
+    results = []
+    for cls in SCRAPERS:
+        scraper = cls()
+        html = (FIXTURES_DIR / f"{scraper.museum_slug}.html").read_text()
+        current_museum.set(scraper.museum_slug)
+        cards = sum(1 for _ in scraper.parse(html))
+        iterations = args.parse_iterations
+
+        def run(scraper=scraper, html=html, iterations=iterations):
+            for _ in range(iterations):
+                for _ in scraper.parse(html):
+                    pass
+
+        results.append(measure(f"parse.{scraper.museum_slug}", run, ops=cards * iterations))
+    return results
+
+
+def bench_fetch(args) -> list[Result]:
+    """Full fetch() (replayed download + parse) for every scraper, sequential and concurrent."""
+    transport = ReplayTransport(FIXTURES_DIR, latency_ms=args.replay_latency_ms)
+    scrapers = [cls(transport=transport) for cls in SCRAPERS]
+
+    async def fetch_all(scraper):
+        # fetch() parses lazily; drain it so parsing is included
+        return list(await scraper.fetch())
+
+    async def sequential():
+        for scraper in scrapers:
+            await fetch_all(scraper)
+
+    async def concurrent():
+        await asyncio.gather(*(fetch_all(scraper) for scraper in scrapers))
+
+    return [
+        measure("fetch.replay.sequential", lambda: asyncio.run(sequential()), ops=len(scrapers)),
+        measure("fetch.replay.concurrent", lambda: asyncio.run(concurrent()), ops=len(scrapers)),
+    ]
+
+
+def bench_date(args) -> list[Result]:
+    samples = DATE_SAMPLES * (args.date_iterations // len(DATE_SAMPLES) or 1)
+
+    def run():
+        for raw in samples:
+            parse_uk_date_range(raw)
+
+    return [measure("date.parse_uk_date_range", run, ops=len(samples))]
+
+
+def synthetic_exhibitions(n: int, seed: int = 0) -> dict[str, list[RawExhibition]]:
+    """`n` exhibitions spread across the museums, keyed by museum slug."""
+    rng = random.Random(seed)
+    today = date.today()
+    by_museum: dict[str, list[RawExhibition]] = {m: [] for m in MUSEUMS}
+    for i in range(n):
+        museum = MUSEUMS[i % len(MUSEUMS)]
+        start = today + timedelta(days=rng.randint(-365, 365))
+        end = start + timedelta(days=rng.randint(7, 365))
+        shape = rng.random()
+        by_museum[museum].append(
+            RawExhibition(
+                title=f"Exhibition {i}",
+                url=f"https://example.org/{museum}/exhibitions/{i}",
+                raw_dates=f"{start:%d %B %Y} – {end:%d %B %Y}",
+                date_start=None if shape < 0.1 else start.isoformat(),
+                date_end=None if 0.1 <= shape < 0.2 else end.isoformat(),
+                admission=rng.choice(["free", "paid", "included", None]),
+            )
+        )
+    return by_museum
+
+
+async def _store_all(storage, by_museum: dict[str, list[RawExhibition]], generation: int) -> int:
+    stored = 0
+    for cls in SCRAPERS:
+        scraper = cls()
+        stored += await scraper._store(
+            storage, by_museum[scraper.museum_slug], "bench", generation, set(),
+        )
+    return stored
+
+
+def _bench_storage(backend: str, storage, scale: int, run) -> list[Result]:
+    """Upsert then query `scale` synthetic rows through a freshly initialised backend."""
+    results = []
+    run(storage.init_db())
+    by_museum = synthetic_exhibitions(scale)
+
+    # Insert and unchanged-update passes each need a fresh table state, so
+    # they are timed once rather than best-of-N.
+    for phase in ("insert", "update"):
+        generation = run(storage.begin_generation())
+        tracemalloc.start()
+        start = time.perf_counter()
+        run(_store_all(storage, by_museum, generation))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        run(storage.finish_generation(generation))
+        results.append(Result(f"{backend}.upsert.{phase}.{scale}", scale, elapsed, peak))
+    del by_museum
+
+    today = date.today()
+    queries = [
+        (f"{museum or 'all'}.{status or 'all'}", {"museum": museum, "status": status})
+        for museum, status in [(None, None), ("tate", None), (None, "current"), ("tate", "current")]
+    ] + [
+        ("open_on", {"open_from": today, "open_to": today}),
+        ("closing_within_14", {"ends_from": today, "ends_to": today + timedelta(days=14)}),
+    ]
+    repeat = max(1, min(5, 100_000 // scale))
+    for label, filters in queries:
+        rows = len(run(storage.query_exhibitions(**filters)))
+        results.append(measure(
+            f"{backend}.query.{label}.{scale}",
+            lambda filters=filters: run(storage.query_exhibitions(**filters)),
+            ops=rows,
+            repeat=repeat,
+        ))
+    return results
+
+
+def bench_db(args) -> list[Result]:
+    """Storage backends: SQLite always, PostgreSQL when --postgres-dsn is given."""
+    from app.storage.sqlite import SQLiteStorage
+
+    results = []
+    loop = asyncio.new_event_loop()
+    try:
+        for scale in args.scales:
+            with tempfile.TemporaryDirectory() as tmp:
+                database.DB_PATH = pathlib.Path(tmp) / "bench.db"
+                results += _bench_storage("sqlite", SQLiteStorage(), scale, loop.run_until_complete)
+
+        if args.postgres_dsn:
+            from app.storage.postgres import PostgresStorage
+
+            storage = PostgresStorage(args.postgres_dsn)
+            try:
+                for scale in args.scales:
+                    loop.run_until_complete(_reset_postgres(storage))
+                    results += _bench_storage("postgres", storage, scale, loop.run_until_complete)
+            finally:
+                loop.run_until_complete(storage.close())
+    finally:
+        loop.close()
+    return results
+
+
+async def _reset_postgres(storage):
+    """Drop the benchmark tables. The DSN must point at a throwaway database."""
+    pool = await storage._get_pool()
+    await pool.execute("DROP TABLE IF EXISTS exhibitions, scrape_generations, feeds")
+
+
+def bench_json(args) -> list[Result]:
+    """
+    /api/exhibitions serialization: FastAPI's default path vs orjson, in rows
+    per second, then cache hits through the real _cached_json path, in
+    responses per second, with the generation read from storage and from a
+    snapshot.
+    """
+    import orjson
+    from fastapi.encoders import jsonable_encoder
+
+    from app import snapshot
+    from app.api import routes
+    from app.storage import get_storage
+
+    rows = []
+    for museum, exhibitions in synthetic_exhibitions(args.json_rows).items():
+        for ex in exhibitions:
+            rows.append({
+                "museum": museum, "museum_label": museum, "title": ex.title, "url": ex.url,
+                "date_start": ex.date_start, "date_end": ex.date_end, "status": "current",
+                "admission": ex.admission, "raw_dates": ex.raw_dates, "scraped_at": "bench",
+            })
+    n = len(rows)
+    results = [
+        measure(f"json.jsonable_encoder+json.{n}", lambda: json.dumps(jsonable_encoder(rows)).encode(), ops=n),
+        measure(f"json.orjson.{n}", lambda: orjson.dumps(rows), ops=n),
+    ]
+
+    async def build():
+        return rows
+
+    loop = asyncio.new_event_loop()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = pathlib.Path(tmp)
+            database.DB_PATH = tmp / "bench.db"
+            storage = get_storage()
+            loop.run_until_complete(storage.init_db())
+            generation = loop.run_until_complete(storage.begin_generation())
+            loop.run_until_complete(storage.finish_generation(generation))
+
+            snapshot_enabled = routes.SNAPSHOT_ENABLED
+            for source in ("storage", "snapshot"):
+                snapshot_dir = tmp / source
+                if source == "snapshot":
+                    snapshot.write_snapshot(snapshot_dir, generation, [], [])
+                snapshot._reader = snapshot.SnapshotReader(snapshot_dir)
+                routes.SNAPSHOT_ENABLED = source == "snapshot"
+                routes.response_cache = routes.GenerationCache()
+                loop.run_until_complete(routes._cached_json("all", build))  # warm the cache
+                results.append(measure(
+                    f"json.cached_response.{source}.{n}",
+                    lambda: loop.run_until_complete(routes._cached_json("all", build)),
+                    ops=1,
+                ))
+            snapshot._reader = None
+            routes.SNAPSHOT_ENABLED = snapshot_enabled
+    finally:
+        loop.close()
+    return results
+
+
+BENCHMARKS = {
+    "parse": bench_parse,
+    "fetch": bench_fetch,
+    "date": bench_date,
+    "db": bench_db,
+    "json": bench_json,
+}
+
+
+def compare(results: list[Result], baseline: dict, tolerance: float) -> list[str]:
+    """Print a report and return the names of benchmarks that regressed."""
+    regressions = []
+    print(f"{'benchmark':<40} {'ops/s':>14} {'peak KiB':>10} {'vs baseline':>12}")
+    for r in results:
+        base = baseline.get(r.name)
+        delta = ""
+        if base and base.get("throughput"):
+            ratio = r.throughput / base["throughput"]
+            delta = f"{ratio - 1:+.1%}"
+            if ratio < 1 - tolerance:
+                delta += " !"
+                regressions.append(r.name)
+        print(f"{r.name:<40} {r.throughput:>14,.0f} {r.peak_bytes / 1024:>10,.0f} {delta:>12}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmark groups to run")
+    parser.add_argument("--scales", nargs="+", type=int, default=DEFAULT_SCALES, help="row counts for DB benchmarks")
+    parser.add_argument("--parse-iterations", type=int, default=20)
+    parser.add_argument("--date-iterations", type=int, default=1_000)
+    parser.add_argument("--postgres-dsn", help="also benchmark PostgreSQL (throwaway DB: tables are dropped)")
+    parser.add_argument("--json-rows", type=int, default=10_000, help="rows for serialization benchmarks")
+    parser.add_argument("--replay-latency-ms", type=float, default=0, help="simulated latency for fetch benchmarks")
+    parser.add_argument("--baseline", type=pathlib.Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed throughput drop before flagging")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    results: list[Result] = []
+    for name in args.only or BENCHMARKS:
+        results.extend(BENCHMARKS[name](args))
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        baseline.update({r.name: {**asdict(r), "throughput": r.throughput} for r in results})
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%}")
+        return 1 if args.fail_on_regression else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
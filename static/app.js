@@ -1,4 +1,17 @@
 document.addEventListener('DOMContentLoaded', () => {
+  // Static exports have one page per filter combination, not a query string
+  const filters = document.querySelector('form.filters[data-static]');
+  if (filters) {
+    filters.addEventListener('submit', (event) => {
+      event.preventDefault();
+      const museum = filters.elements.museum.value;
+      const status = filters.elements.status.value;
+      window.location.href = (museum || status)
+        ? `/exhibitions/${museum || 'all'}/${status || 'all'}/`
+        : '/';
+    });
+  }
+
   const btn = document.getElementById('refresh-btn');
   if (!btn) return;
 
@@ -0,0 +1,59 @@
+"""
+Storage fixtures. Every test taking `storage` runs once per backend.
+
+    pip install -r requirements-dev.txt
+    pytest
+
+The PostgreSQL side uses TEST_DATABASE_URL (a throwaway database: tables are
+dropped between tests) or, failing that, a local stand-in started with the
+`pgserver` package from requirements-dev.txt. It is skipped when neither is
+available.
+"""
+import asyncio
+import os
+
+import pytest
+
+from app import database
+from app.storage.postgres import PostgresStorage
+from app.storage.sqlite import SQLiteStorage
+
+
+@pytest.fixture(scope="session")
+def postgres_dsn(tmp_path_factory):
+    dsn = os.environ.get("TEST_DATABASE_URL")
+    if dsn:
+        return dsn
+    try:
+        import pgserver
+    except ImportError:
+        pytest.skip("no TEST_DATABASE_URL and pgserver not installed (see requirements-dev.txt)")
+    server = pgserver.get_server(tmp_path_factory.mktemp("pgdata"))
+    return server.get_uri()
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine on this test's event loop (asyncpg pools are loop-bound)."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def storage(request, run, tmp_path, monkeypatch):
+    if request.param == "sqlite":
+        monkeypatch.setattr(database, "DB_PATH", tmp_path / "museums.db")
+        backend = SQLiteStorage()
+    else:
+        backend = PostgresStorage(request.getfixturevalue("postgres_dsn"))
+        run(_drop_tables(backend))
+
+    run(backend.init_db())
+    yield backend
+    run(backend.close())
+
+
+async def _drop_tables(backend: PostgresStorage):
+    pool = await backend._get_pool()
+    await pool.execute("DROP TABLE IF EXISTS exhibitions, scrape_generations, feeds")
@@ -0,0 +1,29 @@
+import pytest
+
+import app.storage
+from app import feeds
+from app.feeds import get_or_publish_feed
+from test_storage import scrape
+
+
+@pytest.fixture(autouse=True)
+def use_storage(storage, monkeypatch):
+    monkeypatch.setattr(app.storage, "_storage", storage)
+
+
+def test_missing_feed_is_published_on_demand(run, storage):
+    generation = scrape(run, storage, "a")
+    assert run(storage.get_feed("tate.atom")) is None
+
+    feed = run(get_or_publish_feed("tate.atom"))
+    assert feed["generation"] == generation
+    assert b"https://example.org/a" in bytes(feed["body"])
+
+
+def test_feed_still_missing_after_publishing_raises(run, storage, monkeypatch):
+    async def publish_nothing(generation=None):
+        return 0
+
+    monkeypatch.setattr(feeds, "publish_feeds", publish_nothing)
+    with pytest.raises(LookupError, match="tate.ics"):
+        run(get_or_publish_feed("tate.ics"))
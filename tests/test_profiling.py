@@ -0,0 +1,28 @@
+import sys
+
+from app import profiling
+
+
+def test_pyinstrument_missing_falls_back_to_cprofile(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+    monkeypatch.setattr(profiling, "PROFILER", "pyinstrument")
+    monkeypatch.setitem(sys.modules, "pyinstrument", None)  # import raises ImportError
+
+    ran = False
+    with profiling.profiled("scrape"):
+        ran = True
+
+    assert ran
+    assert [p["format"] for p in profiling.list_profiles()] == ["cprofile"]
+    assert profiling.profile_path(profiling.list_profiles()[0]["name"]) is not None
+
+
+def test_failed_save_does_not_raise(monkeypatch, tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", blocker)
+    monkeypatch.setattr(profiling, "PROFILER", "cprofile")
+
+    with profiling.profiled("scrape"):
+        pass
+    assert profiling.list_profiles() == []
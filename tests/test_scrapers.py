@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from app import memory
+from app.config import BASE_DIR
+from app.memory import MB, MemoryBudget
+from app.scrapers.base import ParseStream
+from app.scrapers.tate import TateScraper
+from app.scrapers.transport import LiveTransport
+from app.scrapers.vam import VAMScraper
+
+FIXTURES_DIR = BASE_DIR / "benchmarks" / "fixtures"
+
+
+def test_parse_streams_records():
+    scraper = TateScraper(transport=LiveTransport())
+    html = (FIXTURES_DIR / "tate.html").read_text()
+    records = scraper.parse(html)
+    assert not isinstance(records, list)
+
+    stream = ParseStream(scraper.museum_slug, records)
+    first = next(stream)
+    assert first.url.startswith(scraper.base_url) and stream.count == 1
+    assert stream.count + sum(1 for _ in stream) == 40
+    assert stream.count == 40
+
+
+@pytest.fixture
+def rss(monkeypatch):
+    current = {"bytes": 100 * MB}
+    monkeypatch.setattr(memory, "rss_bytes", lambda: current["bytes"])
+    return current
+
+
+def _admit_all(budget, scrapers):
+    """Admit scrapers in order, holding them; return which got in without waiting."""
+    admitted, held = [], []
+
+    async def main():
+        for scraper in scrapers:
+            cm = budget.admit(scraper)
+            held.append(cm)  # keep admitted scrapers "running"
+            try:
+                await asyncio.wait_for(cm.__aenter__(), timeout=0.05)
+            except asyncio.TimeoutError:
+                continue
+            admitted.append(scraper.museum_slug)
+
+    asyncio.run(main())
+    return admitted
+
+
+def test_budget_gates_light_scrapers(rss):
+    budget = MemoryBudget(200, heavy_estimate_mb=300, light_estimate_mb=40, poll_seconds=0.01)
+    tate = [TateScraper(transport=LiveTransport()) for _ in range(4)]
+    # 100 MB RSS + 40 MB each: the third would overshoot 200 MB
+    assert _admit_all(budget, tate) == ["tate", "tate"]
+
+
+def test_budget_admits_lone_scraper_over_budget(rss):
+    rss["bytes"] = 500 * MB
+    budget = MemoryBudget(200, heavy_estimate_mb=300, light_estimate_mb=40, poll_seconds=0.01)
+    vam = VAMScraper(transport=LiveTransport())
+    assert _admit_all(budget, [vam, TateScraper(transport=LiveTransport())]) == ["vam"]
+
+
+def test_budget_reserves_heavy_estimate(rss):
+    budget = MemoryBudget(500, heavy_estimate_mb=300, light_estimate_mb=40, poll_seconds=0.01)
+    scrapers = [TateScraper(transport=LiveTransport()), VAMScraper(transport=LiveTransport())]
+    # 100 + 40 + 300 fits in 500; a second heavy scraper would not
+    assert _admit_all(budget, scrapers + [VAMScraper(transport=LiveTransport())]) == ["tate", "vam"]
@@ -0,0 +1,81 @@
+import itertools
+
+import pytest
+
+import app.storage
+from app import snapshot
+from app.snapshot import Snapshot, sync_snapshot, write_snapshot
+from test_storage import make_row, scrape
+
+ROWS = [
+    make_row("spring", 0, date_start="2026-03-01", date_end="2026-05-31", admission="paid"),
+    make_row("permanent", 0, date_start=None, date_end=None),
+    make_row("open-ended", 0, date_end=None, raw_dates="From 1 May 2026"),
+    make_row("soon", 0, status="upcoming", date_start="2027-01-01"),
+    make_row("unknown", 0, status="unknown", date_start=None),
+    make_row("café", 0, museum="kew", title="Café — “Blooms” 🌸", admission="free"),
+    make_row("soon", 0, museum="kew", status="upcoming", date_start="2027-01-01", date_end=None),
+    make_row("same-day", 0, museum="vam", date_start="2026-03-01"),
+]
+
+
+@pytest.fixture
+def snapshots(storage, tmp_path, monkeypatch):
+    """Snapshots in tmp_path, published from `storage`."""
+    monkeypatch.setattr(app.storage, "_storage", storage)
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", tmp_path / "snapshots")
+    monkeypatch.setattr(snapshot, "_reader", None)
+    monkeypatch.setattr(snapshot, "_checked_at", float("-inf"))
+    monkeypatch.setattr(snapshot, "_stale_generation", None)
+    return tmp_path / "snapshots"
+
+
+def test_query_matches_storage(run, storage, tmp_path):
+    generation = run(storage.begin_generation())
+    run(storage.upsert_exhibitions([{**row, "generation": generation} for row in ROWS]))
+    run(storage.finish_generation(generation))
+
+    path = write_snapshot(
+        tmp_path, generation, run(storage.query_exhibitions()), run(storage.query_status()),
+    )
+    snap = Snapshot(path)
+    assert snap.generation == generation
+    assert snap.status_summary == run(storage.query_status())
+
+    museums = (None, "tate", "kew", "vam", "british_museum")
+    statuses = (None, "current", "upcoming", "unknown", "closed")
+    for museum, status in itertools.product(museums, statuses):
+        expected = run(storage.query_exhibitions(museum=museum, status=status))
+        assert snap.query(museum=museum, status=status) == expected, (museum, status)
+
+
+def test_sync_republishes_when_behind_storage(run, storage, snapshots):
+    g1 = scrape(run, storage, "a")
+    assert run(sync_snapshot(force=True)).generation == g1
+
+    # Another host (or a failed publish) moved storage on without us
+    g2 = scrape(run, storage, "a", "b")
+    snap = run(sync_snapshot(force=True))
+    assert snap.generation == g2
+    assert [r["url"] for r in snap.query()] == [r["url"] for r in run(storage.query_exhibitions())]
+
+
+def test_sync_keeps_snapshot_while_a_run_is_writing(run, storage, snapshots):
+    g1 = scrape(run, storage, "a")
+    run(sync_snapshot(force=True))
+    run(storage.begin_generation())
+    assert run(sync_snapshot(force=True)).generation == g1
+
+
+def test_sync_falls_back_to_storage_when_republish_fails(run, storage, snapshots, monkeypatch):
+    scrape(run, storage, "a")
+    run(sync_snapshot(force=True))
+    scrape(run, storage, "a", "b")
+
+    async def fail(generation=None):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(snapshot, "publish_snapshot", fail)
+    assert run(sync_snapshot(force=True)) is None
+    # Between checks the out-of-date snapshot stays withheld
+    assert run(sync_snapshot()) is None
@@ -0,0 +1,231 @@
+"""Contract tests run against every Storage backend (see conftest.py)."""
+from datetime import date
+
+from app import database
+from app.storage import postgres
+
+SCRAPED_AT = "2026-10-19T09:00:00+00:00"
+
+
+def make_row(url, generation, museum="tate", **fields):
+    row = {
+        "museum": museum,
+        "title": url.title(),
+        "url": f"https://example.org/{url}",
+        "date_start": "2026-01-01",
+        "date_end": "2027-12-31",
+        "status": "current",
+        "admission": None,
+        "raw_dates": None,
+        "scraped_at": SCRAPED_AT,
+        "generation": generation,
+    }
+    row.update(fields)
+    return row
+
+
+def scrape(run, storage, *slugs, museum="tate", **fields) -> int:
+    """One finished scrape run that lists exactly `slugs` for `museum`."""
+    generation = run(storage.begin_generation())
+    rows = [make_row(slug, generation, museum=museum, **fields) for slug in slugs]
+    run(storage.upsert_exhibitions(rows))
+    run(storage.tombstone_missing(museum, {r["url"] for r in rows}, generation))
+    run(storage.finish_generation(generation))
+    return generation
+
+
+def urls(rows) -> list[str]:
+    return sorted(r["url"].rsplit("/", 1)[1] for r in rows)
+
+
+def test_empty(run, storage):
+    assert run(storage.is_db_empty())
+    assert run(storage.generation_state()) == (0, True)
+    assert run(storage.query_exhibitions()) == []
+
+
+def test_generation_only_moves_on_change(run, storage):
+    g1 = scrape(run, storage, "a", "b")
+    g2 = scrape(run, storage, "a", "b", title="Renamed")
+    g3 = scrape(run, storage, "a", "b", title="Renamed")
+
+    assert run(storage.generation_state()) == (g3, True)
+    assert urls(run(storage.query_changes(g1))["changed"]) == ["a", "b"]
+    # g3 re-listed identical content: nothing changed after g2
+    changes = run(storage.query_changes(g2))
+    assert changes["generation"] == g3
+    assert changes["changed"] == [] and changes["removed"] == []
+
+
+def test_tombstone_and_revive(run, storage):
+    g1 = scrape(run, storage, "a", "b")
+    g2 = scrape(run, storage, "a")
+
+    assert urls(run(storage.query_exhibitions())) == ["a"]
+    assert run(storage.count_live("tate")) == 1
+    changes = run(storage.query_changes(g1))
+    assert changes["changed"] == []
+    assert changes["removed"] == [
+        {"museum": "tate", "url": "https://example.org/b", "generation": g2},
+    ]
+
+    g3 = scrape(run, storage, "a", "b")
+    assert urls(run(storage.query_exhibitions())) == ["a", "b"]
+    changes = run(storage.query_changes(g2))
+    assert urls(changes["changed"]) == ["b"]
+    assert changes["changed"][0]["generation"] == g3
+    assert changes["removed"] == []
+
+
+def test_changes_cursor_skips_running_generation(run, storage):
+    g1 = scrape(run, storage, "a", "b")
+
+    g2 = run(storage.begin_generation())
+    run(storage.upsert_exhibitions([make_row("c", g2)]))
+    run(storage.tombstone_missing("tate", {"https://example.org/a", "https://example.org/c"}, g2))
+    mid_run = run(storage.query_changes(g1))
+    assert mid_run["generation"] == g1
+    assert mid_run["changed"] == [] and mid_run["removed"] == []
+
+    run(storage.upsert_exhibitions([make_row("d", g2)]))
+    run(storage.finish_generation(g2))
+    changes = run(storage.query_changes(mid_run["generation"]))
+    assert changes["generation"] == g2
+    assert urls(changes["changed"]) == ["c", "d"]
+    assert [r["url"] for r in changes["removed"]] == ["https://example.org/b"]
+
+
+def test_scrape_runs_are_exclusive(run, storage, monkeypatch):
+    g1 = scrape(run, storage, "a")
+    g2 = run(storage.begin_generation())
+    # A second run (another worker, or /api/refresh mid-scrape) is refused,
+    # so it can't finish ahead of g2 and move the cursor past g2's writes
+    assert run(storage.begin_generation()) is None
+
+    run(storage.upsert_exhibitions([make_row("a", g2, title="Renamed")]))
+    run(storage.finish_generation(g2))
+    assert urls(run(storage.query_changes(g1))["changed"]) == ["a"]
+    g3 = run(storage.begin_generation())
+    assert g3 > g2
+
+    # A run its process never finished stops blocking once it times out
+    for module in (database, postgres):
+        monkeypatch.setattr(module, "SCRAPE_RUN_TIMEOUT_HOURS", 0)
+    assert run(storage.begin_generation()) > g3
+
+
+def test_generation_state_settles_when_no_run_is_writing(run, storage, monkeypatch):
+    g1 = scrape(run, storage, "a")
+    assert run(storage.generation_state()) == (g1, True)
+    g2 = run(storage.begin_generation())
+    assert run(storage.generation_state()) == (g2, False)
+    run(storage.finish_generation(g2))
+    assert run(storage.generation_state()) == (g2, True)
+
+    # A run whose process died never finishes; it stops counting once timed out
+    g3 = run(storage.begin_generation())
+    assert run(storage.generation_state()) == (g3, False)
+    for module in (database, postgres):
+        monkeypatch.setattr(module, "SCRAPE_RUN_TIMEOUT_HOURS", 0)
+    assert run(storage.generation_state()) == (g3, True)
+
+
+def test_compaction_keeps_tombstones_clients_still_need(run, storage, monkeypatch):
+    for module in (database, postgres):
+        monkeypatch.setattr(module, "TOMBSTONE_RETENTION_GENERATIONS", 1)
+    scrape(run, storage, "a", "b")
+    g2 = scrape(run, storage, "a", "b", title="Renamed")
+    g3 = scrape(run, storage, "a")
+
+    # Compacting mid-run must use the same horizon as the reset flag
+    run(storage.begin_generation())
+    run(storage.compact_db())
+    changes = run(storage.query_changes(g2))
+    assert not changes["reset"]
+    assert changes["removed"] == [
+        {"museum": "tate", "url": "https://example.org/b", "generation": g3},
+    ]
+
+
+def test_changes_filter_by_museum(run, storage):
+    scrape(run, storage, "a")
+    scrape(run, storage, "x", museum="kew")
+    assert urls(run(storage.query_changes(0, museum="kew"))["changed"]) == ["x"]
+
+
+def test_generation_at_uses_finished_runs(run, storage):
+    assert run(storage.generation_at("2000-01-01T00:00:00+00:00")) == 0
+    g1 = scrape(run, storage, "a")
+    run(storage.begin_generation())
+    assert run(storage.generation_at("2999-01-01T00:00:00+00:00")) == g1
+
+
+def test_date_filters(run, storage):
+    generation = run(storage.begin_generation())
+    spans = {
+        "spring": ("2026-01-01", "2026-03-31"),
+        "summer": ("2026-03-01", "2026-06-30"),
+        "open-ended": ("2026-05-01", None),
+        "until": (None, "2026-02-15"),
+        "permanent": (None, None),
+        "reversed": ("2026-08-31", "2026-07-01"),
+    }
+    run(storage.upsert_exhibitions([
+        make_row(slug, generation, date_start=start, date_end=end)
+        for slug, (start, end) in spans.items()
+    ]))
+    run(storage.finish_generation(generation))
+
+    def query(**dates):
+        return urls(run(storage.query_exhibitions(**dates)))
+
+    day = date(2026, 3, 15)
+    assert query(open_from=day, open_to=day) == ["permanent", "spring", "summer"]
+    assert query(open_from=date(2026, 7, 15), open_to=date(2026, 7, 20)) == [
+        "open-ended", "permanent", "reversed",
+    ]
+    assert query(open_to=date(2026, 1, 10)) == ["permanent", "spring", "until"]
+    assert query(ends_from=date(2026, 2, 1), ends_to=date(2026, 3, 31)) == ["spring", "until"]
+    assert query(ends_from=date(2026, 8, 1)) == ["reversed"]
+    # Inverted windows are empty, not an error
+    assert query(open_from=date(2027, 5, 10), open_to=date(2027, 5, 1)) == []
+    assert query(ends_from=date(2026, 4, 1), ends_to=date(2026, 2, 1)) == []
+
+
+def test_query_order_and_status(run, storage):
+    generation = run(storage.begin_generation())
+    run(storage.upsert_exhibitions([
+        make_row("later", generation, date_start="2026-06-01"),
+        make_row("soon", generation, status="upcoming", date_start="2027-01-01"),
+        make_row("earlier", generation, date_start="2026-02-01"),
+        make_row("kew", generation, museum="kew", date_start="2026-02-01"),
+    ]))
+    run(storage.finish_generation(generation))
+
+    rows = run(storage.query_exhibitions())
+    assert [r["url"].rsplit("/", 1)[1] for r in rows] == ["kew", "earlier", "later", "soon"]
+    assert urls(run(storage.query_exhibitions(museum="tate", status="current"))) == ["earlier", "later"]
+    assert [(s["museum"], s["count"]) for s in run(storage.query_status())] == [("kew", 1), ("tate", 3)]
+
+
+def test_feeds(run, storage):
+    g1 = scrape(run, storage, "a")
+    assert run(storage.get_feed("tate.ics")) is None
+
+    run(storage.store_feed("tate.ics", "text/calendar", b"one", '"1"', g1))
+    first = run(storage.get_feed("tate.ics"))
+    assert (bytes(first["body"]), first["etag"], first["generation"]) == (b"one", '"1"', g1)
+
+    # Same body next generation: Last-Modified stays put
+    g2 = scrape(run, storage, "a")
+    run(storage.store_feed("tate.ics", "text/calendar", b"one", '"1"', g2))
+    same = run(storage.get_feed("tate.ics"))
+    assert same["generation"] == g2 and same["updated_at"] == first["updated_at"]
+
+    run(storage.store_feed("tate.ics", "text/calendar", b"two", '"2"', g2))
+    changed = run(storage.get_feed("tate.ics"))
+    assert bytes(changed["body"]) == b"two" and changed["updated_at"] >= first["updated_at"]
+
+    entries = run(storage.query_feed_entries("tate"))
+    assert urls(entries) == ["a"]
+    assert entries[0]["changed_at"]  # start of the generation it last changed in